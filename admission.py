@@ -0,0 +1,458 @@
+"""Admission control for upstream APIs (OpenAI, JSearch).
+
+Every outbound call goes through ``get_admission_controller().admit(name)``,
+which combines:
+
+* an AIMD adaptive concurrency limit per upstream: the limit grows by
+  roughly one slot per window of successful calls and halves when the
+  provider signals overload (HTTP 429/5xx, timeouts, connection errors),
+  at most once per window: overloads from calls admitted before the last
+  decrease are part of the same burst and do not cut it again
+* a bounded wait queue, so bursts fail fast instead of piling up
+* a circuit breaker that short-circuits calls while the provider is down
+* an optional SQLite slot table so several processes on one host share the
+  concurrency budget (set ``ADMISSION_DB_PATH``)
+
+Limits are process-wide: Streamlit runs every session in the same process,
+and this module is imported once, so all sessions share one controller.
+"""
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+OVERLOAD_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+OVERLOAD_NAME_MARKERS = ("Timeout", "RateLimit", "Connection", "ServiceUnavailable")
+
+# Call outcomes reported back to the limiter and breaker
+SUCCESS = "success"
+OVERLOAD = "overload"
+ERROR = "error"
+CANCELLED = "cancelled"
+
+
+class AdmissionError(Exception):
+    """Raised when a call to an upstream is rejected or the upstream is overloaded"""
+
+    def __init__(self, upstream: str, message: str):
+        super().__init__(message)
+        self.upstream = upstream
+
+
+class CircuitOpenError(AdmissionError):
+    """The upstream's circuit breaker is open; calls are failing fast"""
+
+    def __init__(self, upstream: str, retry_after: float):
+        super().__init__(
+            upstream,
+            f"{upstream} is temporarily unavailable; retry in {max(retry_after, 1):.0f}s",
+        )
+        self.retry_after = retry_after
+
+
+class QueueTimeoutError(AdmissionError):
+    """The call waited too long, or the wait queue was full"""
+
+
+class ProviderOverloadedError(AdmissionError):
+    """The call was admitted but the upstream answered with an overload error"""
+
+    def __init__(self, upstream: str):
+        super().__init__(upstream, f"{upstream} is overloaded right now; please retry shortly")
+
+
+def is_overload_error(exc: BaseException) -> bool:
+    """Return True if `exc` (or an exception it wraps) signals provider overload"""
+    seen = 0
+    while exc is not None and seen < 5:
+        status = getattr(exc, "status_code", None)
+        response = getattr(exc, "response", None)
+        if status is None and response is not None:
+            status = getattr(response, "status_code", None)
+        if isinstance(status, int):
+            return status in OVERLOAD_STATUS_CODES
+        if any(marker in type(exc).__name__ for marker in OVERLOAD_NAME_MARKERS):
+            return True
+        exc = exc.__cause__ or exc.__context__
+        seen += 1
+    return False
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit with a bounded wait queue"""
+
+    def __init__(self, initial_limit: int = 4, min_limit: int = 1, max_limit: int = 16,
+                 decrease_factor: float = 0.5, max_queue: int = 32):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease_factor = decrease_factor
+        self.max_queue = max_queue
+        self._limit = float(initial_limit)
+        self._in_flight = 0
+        self._waiting = 0
+        self._max_waiting = 0
+        # Bumped on every decrease; calls admitted earlier carry an older epoch
+        self._epoch = 0
+        self._cond = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        return max(self.min_limit, int(self._limit))
+
+    @property
+    def epoch(self) -> int:
+        with self._cond:
+            return self._epoch
+
+    def acquire(self, timeout: float) -> bool:
+        """Wait up to `timeout` seconds for a slot; False if none was obtained"""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            if self._in_flight < self.limit:
+                self._in_flight += 1
+                return True
+            if self._waiting >= self.max_queue:
+                return False
+            self._waiting += 1
+            self._max_waiting = max(self._max_waiting, self._waiting)
+            try:
+                while self._in_flight >= self.limit:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                    self._cond.wait(remaining)
+                self._in_flight += 1
+                return True
+            finally:
+                self._waiting -= 1
+
+    def release(self, outcome: str, epoch: Optional[int] = None) -> None:
+        """Free a slot and adapt the limit.
+
+        `epoch` is the value of `self.epoch` when the call was admitted. An
+        overload from a call admitted before the last decrease is ignored, so
+        a burst of concurrent 429s halves the limit once rather than once per
+        call. Without an epoch the call counts as admitted just now.
+        """
+        with self._cond:
+            self._in_flight -= 1
+            if outcome == SUCCESS:
+                # Additive increase: about +1 after a full window of successes
+                self._limit = min(self.max_limit, self._limit + 1.0 / max(self._limit, 1.0))
+            elif outcome == OVERLOAD and (epoch is None or epoch == self._epoch):
+                self._limit = max(self.min_limit, self._limit * self.decrease_factor)
+                self._epoch += 1
+            self._cond.notify_all()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "limit": self.limit,
+                "in_flight": self._in_flight,
+                "queue_depth": self._waiting,
+                "max_queue_depth": self._max_waiting,
+            }
+
+
+class CircuitBreaker:
+    """Closed -> open after consecutive overloads -> half-open single probe"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        # Bumped when the circuit opens or half-opens; see record()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def retry_after(self) -> Optional[float]:
+        """Seconds until a call may be attempted, or None if calls are allowed now"""
+        with self._lock:
+            return self._retry_after_locked()
+
+    def _retry_after_locked(self) -> Optional[float]:
+        if self._state == self.CLOSED:
+            return None
+        if self._state == self.OPEN:
+            remaining = self._opened_at + self.reset_timeout - time.monotonic()
+            return remaining if remaining > 0 else None
+        # Half-open: only one probe at a time
+        return self.reset_timeout if self._probe_in_flight else None
+
+    def before_call(self) -> Tuple[Optional[float], int]:
+        """Claim permission to call.
+
+        Returns (retry delay, token): the delay is None if the call may go
+        ahead, and the token must be passed to `record` when it finishes.
+        """
+        with self._lock:
+            retry_after = self._retry_after_locked()
+            if retry_after is not None:
+                return retry_after, self._generation
+            if self._state == self.OPEN:
+                self._state = self.HALF_OPEN
+                self._generation += 1
+            if self._state == self.HALF_OPEN:
+                self._probe_in_flight = True
+            return None, self._generation
+
+    def record(self, outcome: str, token: Optional[int] = None) -> None:
+        """Record a finished call.
+
+        Outcomes of calls admitted before the circuit last opened or
+        half-opened are ignored: a slow success from before an outage must
+        not close the circuit, nor release the half-open probe slot.
+        """
+        with self._lock:
+            if token is not None and token != self._generation:
+                return
+            self._probe_in_flight = False
+            if outcome == OVERLOAD:
+                self._failures += 1
+                if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                    self._state = self.OPEN
+                    self._opened_at = time.monotonic()
+                    self._generation += 1
+            elif outcome != CANCELLED:
+                # The provider answered, even if the request itself was bad
+                self._state = self.CLOSED
+                self._failures = 0
+
+
+class SQLiteSlotStore:
+    """Cross-process concurrency slots backed by a local SQLite file.
+
+    Each admitted call holds a row until it finishes. Rows carry an expiry so
+    slots held by a crashed process are reclaimed after `lease_seconds`.
+    """
+
+    def __init__(self, path: str, lease_seconds: float = 300.0, poll_interval: float = 0.1):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS slots ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, upstream TEXT NOT NULL, "
+                "pid INTEGER NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS slots_upstream ON slots (upstream)")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+
+    def try_acquire(self, upstream: str, limit: int) -> Optional[int]:
+        """Take a slot if fewer than `limit` are held host-wide; returns its id"""
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM slots WHERE expires_at < ?", (now,))
+            (held,) = conn.execute(
+                "SELECT COUNT(*) FROM slots WHERE upstream = ?", (upstream,)
+            ).fetchone()
+            if held >= limit:
+                conn.execute("COMMIT")
+                return None
+            cursor = conn.execute(
+                "INSERT INTO slots (upstream, pid, expires_at) VALUES (?, ?, ?)",
+                (upstream, os.getpid(), now + self.lease_seconds),
+            )
+            conn.execute("COMMIT")
+            return cursor.lastrowid
+        except sqlite3.Error:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def acquire(self, upstream: str, limit: int, deadline: float) -> Optional[int]:
+        """Poll for a slot until `deadline` (time.monotonic)"""
+        while True:
+            slot_id = self.try_acquire(upstream, limit)
+            if slot_id is not None or time.monotonic() >= deadline:
+                return slot_id
+            time.sleep(min(self.poll_interval, max(deadline - time.monotonic(), 0)))
+
+    def release(self, slot_id: int) -> None:
+        conn = self._connect()
+        try:
+            conn.execute("DELETE FROM slots WHERE id = ?", (slot_id,))
+        finally:
+            conn.close()
+
+
+class Upstream:
+    """Limiter, breaker and metrics for a single provider"""
+
+    def __init__(self, name: str, limiter: AdaptiveLimiter, breaker: CircuitBreaker,
+                 queue_timeout: float = 30.0, slot_store: Optional[SQLiteSlotStore] = None):
+        self.name = name
+        self.limiter = limiter
+        self.breaker = breaker
+        self.queue_timeout = queue_timeout
+        self.slot_store = slot_store
+        self._lock = threading.Lock()
+        self._counters = {
+            "admitted": 0,
+            "rejected": 0,
+            "short_circuited": 0,
+            "overloads": 0,
+            "errors": 0,
+        }
+        self._total_wait = 0.0
+
+    def _count(self, key: str, wait: float = 0.0) -> None:
+        with self._lock:
+            self._counters[key] += 1
+            self._total_wait += wait
+
+    def _short_circuit(self, retry_after: float) -> CircuitOpenError:
+        self._count("short_circuited")
+        return CircuitOpenError(self.name, retry_after)
+
+    def _reject(self, started: float) -> QueueTimeoutError:
+        self._count("rejected")
+        waited = time.monotonic() - started
+        return QueueTimeoutError(
+            self.name, f"{self.name} is busy (waited {waited:.0f}s for a slot); please retry shortly"
+        )
+
+    @contextmanager
+    def admit(self) -> Iterator[None]:
+        # Fail fast before queueing if the provider is known to be down
+        retry_after = self.breaker.retry_after()
+        if retry_after is not None:
+            raise self._short_circuit(retry_after)
+
+        started = time.monotonic()
+        deadline = started + self.queue_timeout
+        if not self.limiter.acquire(self.queue_timeout):
+            raise self._reject(started)
+        epoch = self.limiter.epoch
+
+        slot_id = None
+        try:
+            if self.slot_store is not None:
+                slot_id = self.slot_store.acquire(self.name, self.limiter.limit, deadline)
+                if slot_id is None:
+                    raise self._reject(started)
+            retry_after, token = self.breaker.before_call()
+            if retry_after is not None:
+                raise self._short_circuit(retry_after)
+        except BaseException:
+            if slot_id is not None:
+                self.slot_store.release(slot_id)
+            self.limiter.release(CANCELLED)
+            raise
+
+        self._count("admitted", time.monotonic() - started)
+        outcome = SUCCESS
+        try:
+            yield
+        except BaseException as exc:
+            outcome = OVERLOAD if is_overload_error(exc) else ERROR
+            self._count("overloads" if outcome == OVERLOAD else "errors")
+            raise
+        finally:
+            if slot_id is not None:
+                try:
+                    self.slot_store.release(slot_id)
+                except sqlite3.Error as e:
+                    logger.warning(f"Failed to release {self.name} slot {slot_id}: {e}")
+            self.limiter.release(outcome, epoch)
+            self.breaker.record(outcome, token)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            total_wait = self._total_wait
+        admitted = counters["admitted"]
+        return {
+            "upstream": self.name,
+            "circuit": self.breaker.state,
+            **self.limiter.snapshot(),
+            **counters,
+            "avg_wait_ms": round(total_wait / admitted * 1000, 1) if admitted else 0.0,
+        }
+
+
+class AdmissionController:
+    """Registry of upstreams sharing one process"""
+
+    def __init__(self, slot_store: Optional[SQLiteSlotStore] = None):
+        self.slot_store = slot_store
+        self._upstreams: Dict[str, Upstream] = {}
+        self._lock = threading.Lock()
+
+    def _create(self, name: str, initial_limit: int = 4, max_limit: int = 16,
+                max_queue: int = 32, queue_timeout: float = 30.0,
+                failure_threshold: int = 5, reset_timeout: float = 30.0) -> Upstream:
+        return Upstream(
+            name,
+            AdaptiveLimiter(initial_limit=initial_limit, max_limit=max_limit, max_queue=max_queue),
+            CircuitBreaker(failure_threshold=failure_threshold, reset_timeout=reset_timeout),
+            queue_timeout=queue_timeout,
+            slot_store=self.slot_store,
+        )
+
+    def register(self, name: str, **settings: Any) -> Upstream:
+        """Create (or replace) upstream `name`; see `_create` for the settings"""
+        upstream = self._create(name, **settings)
+        with self._lock:
+            self._upstreams[name] = upstream
+        return upstream
+
+    def get(self, name: str) -> Upstream:
+        """Return upstream `name`, registering it with defaults on first use"""
+        with self._lock:
+            upstream = self._upstreams.get(name)
+            if upstream is None:
+                upstream = self._upstreams[name] = self._create(name)
+            return upstream
+
+    def admit(self, name: str):
+        """Context manager guarding one call to upstream `name`"""
+        return self.get(name).admit()
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            upstreams = list(self._upstreams.values())
+        return [upstream.snapshot() for upstream in upstreams]
+
+
+_controller: Optional[AdmissionController] = None
+_controller_lock = threading.Lock()
+
+
+def get_admission_controller() -> AdmissionController:
+    """Return the process-wide controller, creating it on first use"""
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            db_path = os.getenv("ADMISSION_DB_PATH")
+            slot_store = SQLiteSlotStore(db_path) if db_path else None
+            controller = AdmissionController(slot_store)
+            # LLM calls are long-running; JSearch calls are short but rate-limited
+            controller.register("openai", initial_limit=4, max_limit=16, queue_timeout=60.0)
+            controller.register("jsearch", initial_limit=4, max_limit=8, queue_timeout=15.0)
+            _controller = controller
+        return _controller
@@ -0,0 +1,130 @@
+"""Cold-start benchmark for the Streamlit app.
+
+Each measurement runs in a fresh interpreter so nothing is already cached in
+``sys.modules``. It reports:
+
+* wall-clock time to import ``streamlit_app`` (what a new replica pays before
+  it can render the first page)
+* the time the deferred heavy dependencies would add if imported eagerly
+* the slowest modules imported directly by ``streamlit_app``, by cumulative
+  time, from ``python -X importtime``
+
+Usage:
+    python benchmark_startup.py [--runs N] [--top N]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import List, Tuple
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+HEAVY_MODULES = ("langchain_openai", "crewai", "PyPDF2", "fpdf", "docx")
+
+
+def time_import(statement: str, runs: int) -> List[float]:
+    """Run `statement` in fresh interpreters and return wall-clock times in seconds"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-c", statement],
+            cwd=APP_DIR,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        elapsed = time.perf_counter() - start
+        if result.returncode != 0:
+            last_line = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "unknown error"
+            raise RuntimeError(f"`{statement}` failed: {last_line}")
+        timings.append(elapsed)
+    return timings
+
+
+def profile_imports(statement: str) -> List[Tuple[int, int, str]]:
+    """Return (self_us, cumulative_us, module) rows from `python -X importtime`"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=APP_DIR,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|", 2)
+        # Nested imports are indented by two spaces per level after "| "
+        rows.append((int(self_us), int(cumulative_us), module.rstrip()[1:]))
+    return rows
+
+
+def direct_imports(rows: List[Tuple[int, int, str]], parent: str) -> List[Tuple[int, int, str]]:
+    """Rows for modules imported directly by the top-level import `parent`.
+
+    importtime prints a module after everything it imports, so the children
+    of `parent` are the rows one level deep just above its own row.
+    """
+    children = []
+    for index, (_, _, module) in enumerate(rows):
+        if module == parent:
+            break
+    else:
+        return children
+    for row in reversed(rows[:index]):
+        depth = (len(row[2]) - len(row[2].lstrip())) // 2
+        if depth == 0:
+            break
+        if depth == 1:
+            children.append(row)
+    return children
+
+
+def summarize(label: str, timings: List[float]) -> str:
+    median = statistics.median(timings) * 1000
+    best = min(timings) * 1000
+    return f"{label:<40} median {median:8.1f} ms   best {best:8.1f} ms   (n={len(timings)})"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per measurement")
+    parser.add_argument("--top", type=int, default=15, help="number of slowest imports to list")
+    args = parser.parse_args()
+
+    print("== Cold import time ==")
+    baseline = time_import("pass", args.runs)
+    print(summarize("python interpreter (baseline)", baseline))
+    app = time_import("import streamlit_app", args.runs)
+    print(summarize("import streamlit_app", app))
+
+    for module in HEAVY_MODULES:
+        try:
+            timings = time_import(f"import {module}", args.runs)
+        except RuntimeError as e:
+            print(f"{'import ' + module:<40} skipped ({e})")
+            continue
+        print(summarize(f"import {module} (deferred)", timings))
+
+    print()
+    print(f"== Slowest direct imports of streamlit_app (top {args.top}, cumulative) ==")
+    rows = profile_imports("import streamlit_app")
+    children = direct_imports(rows, "streamlit_app") or rows
+    for self_us, cumulative_us, module in sorted(children, key=lambda row: row[1], reverse=True)[:args.top]:
+        print(f"{cumulative_us / 1000:9.1f} ms cumulative {self_us / 1000:9.1f} ms self   {module.strip()}")
+
+    loaded = {row[2].strip() for row in rows}
+    eager = [module for module in HEAVY_MODULES if module in loaded]
+    print()
+    if eager:
+        print(f"WARNING: heavy modules imported at startup: {', '.join(eager)}")
+    else:
+        print("OK: no heavy modules imported at startup")
+
+
+if __name__ == "__main__":
+    main()
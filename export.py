@@ -0,0 +1,375 @@
+"""Document export: PDF, DOCX, Markdown and ZIP bundles.
+
+Generated text is parsed once into a small document model (contact block,
+headings, bullets, numbered items and paragraphs) and every format is rendered from that
+model. Rendered files are cached by content hash, so reruns and repeated
+downloads of the same text do not render it again.
+
+ZIP bundles are produced incrementally: each file is rendered, written to
+the archive and released before the next one, and the archive bytes are
+yielded as they are produced (see `iter_bundle`). Bundle entries are not
+added to the render cache.
+"""
+import hashlib
+import importlib.util
+import io
+import re
+import threading
+import zipfile
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+PDF = "pdf"
+DOCX = "docx"
+MARKDOWN = "md"
+
+MIME_TYPES = {
+    PDF: "application/pdf",
+    DOCX: "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    MARKDOWN: "text/markdown",
+    "zip": "application/zip",
+}
+
+FORMAT_LABELS = {PDF: "PDF", DOCX: "Word (DOCX)", MARKDOWN: "Markdown"}
+
+CACHE_MAX_BYTES = 32 * 1024 * 1024
+ZIP_CHUNK_SIZE = 64 * 1024
+
+BULLET_RE = re.compile(r"^\s*[-*+•▪●◦]\s+(.*)$")
+NUMBERED_RE = re.compile(r"^\s*(\d+)[.)]\s+(.*)$")
+MD_HEADING_RE = re.compile(r"^(#{1,6})\s+(.*?)\s*#*$")
+CONTACT_RE = re.compile(
+    r"[\w.+-]+@[\w-]+\.[\w.]+"            # email
+    r"|\+?\d[\d\s().-]{7,}\d"               # phone
+    r"|linkedin\.com|github\.com|https?://",
+    re.IGNORECASE,
+)
+INLINE_MARKUP_RE = re.compile(r"(\*\*|__)(.+?)\1")
+
+# Characters the PDF core fonts (latin-1) cannot draw
+PDF_REPLACEMENTS = {
+    "•": "-", "▪": "-", "●": "-", "◦": "-",
+    "–": "-", "—": "-", "‘": "'", "’": "'",
+    "“": '"', "”": '"', "…": "...", "\u00a0": " ",
+}
+
+
+@dataclass(frozen=True)
+class Block:
+    """One structural element; paragraph text may contain line breaks"""
+    kind: str  # "heading", "bullet", "numbered" or "paragraph"
+    text: str
+    level: int = 1
+    number: Optional[int] = None  # original number of a "numbered" item
+
+
+@dataclass(frozen=True)
+class Document:
+    title: str
+    contact: Tuple[str, ...] = ()
+    blocks: Tuple[Block, ...] = field(default_factory=tuple)
+
+
+def available_formats() -> List[str]:
+    """Formats whose rendering libraries are installed"""
+    formats = [PDF, MARKDOWN]
+    if importlib.util.find_spec("docx") is not None:
+        formats.insert(1, DOCX)
+    return formats
+
+
+def _clean(line: str) -> str:
+    return INLINE_MARKUP_RE.sub(r"\2", line).strip()
+
+
+def _heading_text(line: str) -> Optional[Tuple[str, int]]:
+    """Return (text, level) if `line` looks like a section heading"""
+    match = MD_HEADING_RE.match(line)
+    if match:
+        return _clean(match.group(2)), len(match.group(1))
+    stripped = line.strip()
+    if stripped.startswith("**") and stripped.endswith("**") and len(stripped) <= 64:
+        return _clean(stripped).rstrip(":"), 2
+    if len(stripped) > 48 or stripped.endswith("."):
+        return None
+    letters = [c for c in stripped if c.isalpha()]
+    if letters and stripped.upper() == stripped and len(letters) >= 3:
+        return stripped.rstrip(":"), 2
+    if stripped.endswith(":") and len(stripped.split()) <= 5:
+        return stripped.rstrip(":"), 2
+    return None
+
+
+@lru_cache(maxsize=64)
+def parse_document(text: str, title: str = "") -> Document:
+    """Parse generated resume/cover letter text into a Document"""
+    lines = [line.rstrip() for line in text.replace("\r\n", "\n").split("\n")]
+
+    # Contact block: the leading lines up to the first blank line or heading,
+    # kept only if they actually contain contact details
+    contact: List[str] = []
+    start = 0
+    while start < len(lines) and not lines[start].strip():
+        start += 1
+    end = start
+    while end < len(lines) and lines[end].strip() and end - start < 6:
+        if end > start and _heading_text(lines[end]):
+            break
+        end += 1
+    header = [_clean(MD_HEADING_RE.sub(r"\2", line)) for line in lines[start:end]]
+    if any(CONTACT_RE.search(line) for line in header):
+        contact = header
+        start = end
+
+    blocks: List[Block] = []
+    paragraph: List[str] = []
+
+    def flush_paragraph():
+        if paragraph:
+            blocks.append(Block("paragraph", "\n".join(paragraph)))
+            paragraph.clear()
+
+    for line in lines[start:]:
+        if not line.strip():
+            flush_paragraph()
+            continue
+        numbered = NUMBERED_RE.match(line)
+        if numbered:
+            flush_paragraph()
+            blocks.append(Block("numbered", _clean(numbered.group(2)), number=int(numbered.group(1))))
+            continue
+        bullet = BULLET_RE.match(line)
+        if bullet:
+            flush_paragraph()
+            blocks.append(Block("bullet", _clean(bullet.group(1))))
+            continue
+        heading = _heading_text(line)
+        if heading:
+            flush_paragraph()
+            blocks.append(Block("heading", heading[0], heading[1]))
+            continue
+        paragraph.append(_clean(line))
+    flush_paragraph()
+
+    return Document(title=title, contact=tuple(contact), blocks=tuple(blocks))
+
+
+def render_markdown(doc: Document) -> bytes:
+    out: List[str] = []
+    if doc.contact:
+        out.append(f"# {doc.contact[0]}")
+        if len(doc.contact) > 1:
+            out.append("  \n".join(doc.contact[1:]))
+        out.append("")
+    previous = None
+    for block in doc.blocks:
+        if block.kind == "heading":
+            if out and out[-1]:
+                out.append("")
+            out.extend([f"{'#' * min(block.level + 1, 6)} {block.text}", ""])
+        elif block.kind in ("bullet", "numbered"):
+            if previous in ("bullet", "numbered") and previous != block.kind:
+                out.append("")
+            marker = "-" if block.kind == "bullet" else f"{block.number}."
+            out.append(f"{marker} {block.text}")
+        else:
+            if previous in ("bullet", "numbered"):
+                out.append("")
+            out.extend([block.text.replace("\n", "  \n"), ""])
+        previous = block.kind
+    return ("\n".join(out).strip() + "\n").encode("utf-8")
+
+
+def _pdf_text(text: str) -> str:
+    for char, replacement in PDF_REPLACEMENTS.items():
+        text = text.replace(char, replacement)
+    return text.encode("latin-1", "replace").decode("latin-1")
+
+
+def render_pdf(doc: Document) -> bytes:
+    from fpdf import FPDF
+
+    pdf = FPDF()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.add_page()
+
+    if doc.contact:
+        pdf.set_font("Helvetica", "B", 16)
+        pdf.multi_cell(0, 8, _pdf_text(doc.contact[0]), align="C", new_x="LMARGIN", new_y="NEXT")
+        pdf.set_font("Helvetica", size=10)
+        for line in doc.contact[1:]:
+            pdf.multi_cell(0, 5, _pdf_text(line), align="C", new_x="LMARGIN", new_y="NEXT")
+        pdf.ln(4)
+
+    for block in doc.blocks:
+        if block.kind == "heading":
+            pdf.ln(2)
+            pdf.set_font("Helvetica", "B", 13 if block.level <= 2 else 11)
+            pdf.multi_cell(0, 7, _pdf_text(block.text), new_x="LMARGIN", new_y="NEXT")
+            pdf.line(pdf.l_margin, pdf.get_y(), pdf.w - pdf.r_margin, pdf.get_y())
+            pdf.ln(2)
+        elif block.kind in ("bullet", "numbered"):
+            marker = "-" if block.kind == "bullet" else f"{block.number}."
+            pdf.set_font("Helvetica", size=11)
+            pdf.set_x(pdf.l_margin + 4)
+            pdf.multi_cell(0, 6, _pdf_text(f"{marker} {block.text}"), new_x="LMARGIN", new_y="NEXT")
+        else:
+            pdf.set_font("Helvetica", size=11)
+            for line in block.text.split("\n"):
+                pdf.multi_cell(0, 6, _pdf_text(line), new_x="LMARGIN", new_y="NEXT")
+            pdf.ln(3)
+
+    return bytes(pdf.output())
+
+
+def render_docx(doc: Document) -> bytes:
+    import docx
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+    from docx.shared import Inches, Pt
+
+    document = docx.Document()
+    if doc.title:
+        document.core_properties.title = doc.title
+
+    if doc.contact:
+        name = document.add_paragraph()
+        name.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        run = name.add_run(doc.contact[0])
+        run.bold = True
+        run.font.size = Pt(16)
+        if len(doc.contact) > 1:
+            details = document.add_paragraph(" | ".join(doc.contact[1:]))
+            details.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+    for block in doc.blocks:
+        if block.kind == "heading":
+            document.add_heading(block.text, level=min(block.level, 3))
+        elif block.kind == "bullet":
+            document.add_paragraph(block.text, style="List Bullet")
+        elif block.kind == "numbered":
+            # Keep the original number; Word's "List Number" style renumbers
+            item = document.add_paragraph(f"{block.number}. {block.text}")
+            item.paragraph_format.left_indent = Inches(0.25)
+        else:
+            paragraph = document.add_paragraph()
+            for i, line in enumerate(block.text.split("\n")):
+                if i:
+                    paragraph.add_run().add_break()
+                paragraph.add_run(line)
+
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+RENDERERS = {PDF: render_pdf, DOCX: render_docx, MARKDOWN: render_markdown}
+
+
+class RenderCache:
+    """Byte-bounded LRU of rendered files keyed by (format, content hash)"""
+
+    def __init__(self, max_bytes: int = CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._items: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[str, str]) -> Optional[bytes]:
+        with self._lock:
+            data = self._items.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key: Tuple[str, str], data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._items.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous)
+            self._items[key] = data
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self.size -= len(evicted)
+
+
+render_cache = RenderCache()
+
+
+def content_hash(text: str, title: str = "") -> str:
+    digest = hashlib.sha256()
+    digest.update(title.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def render(text: str, fmt: str, title: str = "", store: bool = True) -> bytes:
+    """Render `text` to `fmt`, reusing a cached copy of identical content.
+
+    With `store=False` a cached copy is still used, but a fresh render is not
+    added to the cache.
+    """
+    if fmt not in RENDERERS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    key = (fmt, content_hash(text, title))
+    data = render_cache.get(key)
+    if data is None:
+        data = RENDERERS[fmt](parse_document(text, title))
+        if store:
+            render_cache.put(key, data)
+    return data
+
+
+class _ChunkSink:
+    """Write-only, non-seekable file object collecting ZIP output"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> Iterator[bytes]:
+        chunks, self._chunks = self._chunks, []
+        return iter(chunks)
+
+
+def iter_bundle(documents: Iterable[Tuple[str, str, str]],
+                formats: Iterable[str]) -> Iterator[bytes]:
+    """Yield a ZIP archive of `documents` rendered to each format, chunk by chunk.
+
+    `documents` holds (file stem, text, title) tuples. Only one rendered file
+    is held at a time: entries already in the render cache are reused, but
+    new renders are not added to it.
+    """
+    formats = list(formats)
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for stem, text, title in documents:
+            for fmt in formats:
+                data = render(text, fmt, title, store=False)
+                with archive.open(f"{stem}.{fmt}", "w") as entry:
+                    for offset in range(0, len(data), ZIP_CHUNK_SIZE):
+                        entry.write(data[offset:offset + ZIP_CHUNK_SIZE])
+                del data
+                yield from sink.drain()
+    yield from sink.drain()
+
+
+def build_bundle(documents: Iterable[Tuple[str, str, str]], formats: Iterable[str]) -> bytes:
+    """Return the whole ZIP bundle as bytes, for callers that need it in one piece"""
+    return b"".join(iter_bundle(documents, formats))
@@ -0,0 +1,398 @@
+"""Job search providers and parallel aggregation.
+
+Each provider adapter turns its source's results into the app's job schema
+(the JSearch field names the UI already uses, plus ``job_source``). The
+aggregator queries every configured provider in parallel, gives each one its
+own deadline so a slow provider cannot hold up the others, and merges results
+in the order they arrive, dropping duplicates. If no provider returns a
+result, ``ProvidersUnavailableError`` is raised so an outage is not shown as
+an empty search.
+
+Providers:
+* ``JSearchProvider``: RapidAPI JSearch (needs ``RAPIDAPI_KEY``)
+* ``LocalFeedProvider``: a local JSON file or JSON feed URL
+  (``JOB_FEED_PATH``), mainly for testing and demos
+"""
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import requests
+
+from admission import AdmissionError, ProviderOverloadedError, get_admission_controller, is_overload_error
+
+logger = logging.getLogger(__name__)
+
+JOB_FIELDS = (
+    "job_id",
+    "job_title",
+    "employer_name",
+    "job_city",
+    "job_state",
+    "job_country",
+    "job_description",
+    "job_apply_link",
+    "job_employment_type",
+    "job_source",
+)
+
+# Alternative field names accepted from generic feeds, in order of preference
+FEED_FIELD_ALIASES = {
+    "job_id": ("job_id", "id", "guid"),
+    "job_title": ("job_title", "title", "position"),
+    "employer_name": ("employer_name", "company", "company_name", "employer"),
+    "job_city": ("job_city", "city"),
+    "job_state": ("job_state", "state", "region"),
+    "job_country": ("job_country", "country"),
+    "job_description": ("job_description", "description", "summary"),
+    "job_apply_link": ("job_apply_link", "apply_url", "url", "link"),
+    "job_employment_type": ("job_employment_type", "employment_type", "type"),
+}
+
+# Extra time the aggregator allows past a provider's own timeouts, so the
+# provider reports its timeout itself instead of being abandoned first
+DEADLINE_GRACE = 1.0
+
+
+class ProvidersUnavailableError(Exception):
+    """No provider returned a result, so an empty list would be misleading"""
+
+    def __init__(self, failures: Dict[str, str]):
+        self.failures = failures
+        if failures:
+            reasons = "; ".join(f"{name}: {reason}" for name, reason in failures.items())
+            message = f"Job search is unavailable right now ({reasons}). Please try again shortly."
+        else:
+            message = "No job providers are configured (set RAPIDAPI_KEY or JOB_FEED_PATH)."
+        super().__init__(message)
+
+
+class ProviderStats:
+    """Latency and error counters for one provider"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.queue_timeouts = 0
+        self.total_latency = 0.0
+        self.last_latency = 0.0
+        self.last_error = ""
+
+    def record(self, latency: float, error: Optional[str] = None, timed_out: bool = False) -> None:
+        with self._lock:
+            self.calls += 1
+            self.total_latency += latency
+            self.last_latency = latency
+            if timed_out:
+                self.timeouts += 1
+            if error is not None:
+                self.errors += 1
+                self.last_error = error
+
+    def record_queue_timeout(self) -> None:
+        """The call timed out before a worker picked it up; the provider was never called"""
+        with self._lock:
+            self.queue_timeouts += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "errors": self.errors,
+                "timeouts": self.timeouts,
+                "queue_timeouts": self.queue_timeouts,
+                "error_rate": round(self.errors / self.calls, 3) if self.calls else 0.0,
+                "avg_latency_ms": round(self.total_latency / self.calls * 1000, 1) if self.calls else 0.0,
+                "last_latency_ms": round(self.last_latency * 1000, 1),
+                "last_error": self.last_error,
+            }
+
+
+class JobProvider:
+    """Base class for job search adapters"""
+
+    name = "provider"
+
+    def __init__(self, timeout: float = 10.0):
+        self.timeout = timeout
+        self.stats = ProviderStats()
+
+    def is_configured(self) -> bool:
+        return True
+
+    def max_duration(self) -> float:
+        """How long the aggregator waits for this provider, counted from submission"""
+        return self.timeout
+
+    def fetch(self, job_role: str, location: str) -> List[Dict]:
+        """Return raw results from the source"""
+        raise NotImplementedError
+
+    def normalize(self, raw: Dict) -> Dict:
+        """Map one raw result onto JOB_FIELDS, omitting fields the source lacks"""
+        raise NotImplementedError
+
+    def search(self, job_role: str, location: str) -> List[Dict]:
+        jobs = []
+        for raw in self.fetch(job_role, location):
+            job = self.normalize(raw)
+            job["job_source"] = self.name
+            jobs.append(job)
+        return jobs
+
+
+class JSearchProvider(JobProvider):
+    name = "jsearch"
+    url = "https://jsearch.p.rapidapi.com/search"
+
+    def __init__(self, timeout: float = 30.0, num_pages: int = 10):
+        super().__init__(timeout)
+        self.num_pages = num_pages
+
+    def is_configured(self) -> bool:
+        return bool(os.getenv("RAPIDAPI_KEY"))
+
+    def max_duration(self) -> float:
+        # Admission may queue the call before the request timeout starts
+        queue_timeout = get_admission_controller().get("jsearch").queue_timeout
+        return queue_timeout + self.timeout + DEADLINE_GRACE
+
+    def fetch(self, job_role: str, location: str) -> List[Dict]:
+        headers = {
+            "X-RapidAPI-Key": os.getenv("RAPIDAPI_KEY"),
+            "X-RapidAPI-Host": "jsearch.p.rapidapi.com"
+        }
+        params = {
+            "query": f"{job_role} in {location}",
+            "page": "1",
+            "num_pages": str(self.num_pages)
+        }
+        try:
+            with get_admission_controller().admit("jsearch"):
+                response = requests.get(self.url, headers=headers, params=params, timeout=self.timeout)
+                response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            # Rate limits and 5xx errors are reported like admission rejections
+            if is_overload_error(e):
+                raise ProviderOverloadedError(self.name) from e
+            raise
+        return response.json().get("data", [])
+
+    def normalize(self, raw: Dict) -> Dict:
+        # JSearch already uses the app's schema; keep any extra fields too
+        return dict(raw)
+
+
+class LocalFeedProvider(JobProvider):
+    """Jobs from a JSON file or JSON feed URL.
+
+    The feed may be a list of jobs or an object with a "data" or "jobs" list.
+    Jobs are kept when every word of the role appears in the title or
+    description and the location appears in any location field (or the job
+    is remote).
+    """
+
+    name = "local_feed"
+
+    def __init__(self, source: str, timeout: float = 5.0):
+        super().__init__(timeout)
+        self.source = source
+
+    def _load(self) -> Any:
+        if self.source.startswith(("http://", "https://")):
+            response = requests.get(self.source, timeout=self.timeout)
+            response.raise_for_status()
+            return response.json()
+        with open(self.source, encoding="utf-8") as f:
+            return json.load(f)
+
+    def fetch(self, job_role: str, location: str) -> List[Dict]:
+        feed = self._load()
+        if isinstance(feed, dict):
+            feed = feed.get("data", feed.get("jobs", []))
+        role_words = job_role.lower().split()
+        location = location.lower().strip()
+        matches = []
+        for raw in feed:
+            text = f"{raw.get('job_title', raw.get('title', ''))} {raw.get('job_description', raw.get('description', ''))}".lower()
+            if not all(word in text for word in role_words):
+                continue
+            if location:
+                where = " ".join(str(value) for key, value in raw.items()
+                                 if key in ("job_city", "city", "job_state", "state", "job_country",
+                                            "country", "location") and value).lower()
+                remote = bool(raw.get("job_is_remote") or raw.get("remote")) or "remote" in where
+                if location not in where and not (remote and "remote" in location):
+                    continue
+            matches.append(raw)
+        return matches
+
+    def normalize(self, raw: Dict) -> Dict:
+        job = {}
+        for field, aliases in FEED_FIELD_ALIASES.items():
+            value = next((raw[alias] for alias in aliases if raw.get(alias)), None)
+            if value is not None:
+                job[field] = value
+        if "job_city" not in job and raw.get("location"):
+            job["job_city"] = raw["location"]
+        job.setdefault("job_id", f"{self.name}:{job.get('job_title')}:{job.get('employer_name')}")
+        return job
+
+
+class _ProviderCall:
+    """Bookkeeping shared by a worker and the aggregator for one provider call"""
+
+    def __init__(self, provider: JobProvider):
+        self.provider = provider
+        self.lock = threading.Lock()
+        self.started: Optional[float] = None
+        self.finished = False
+        self.timed_out = False
+
+
+def dedupe_key(job: Dict) -> Tuple[str, str, str]:
+    return tuple(str(job.get(field) or "").strip().lower()
+                 for field in ("job_title", "employer_name", "job_city"))
+
+
+class JobAggregator:
+    """Queries providers in parallel and merges their results"""
+
+    def __init__(self, providers: List[JobProvider], max_workers: int = 8):
+        self.providers = providers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job-provider")
+
+    def _call(self, call: _ProviderCall, job_role: str, location: str) -> List[Dict]:
+        call.started = time.monotonic()
+        error = None
+        try:
+            return call.provider.search(job_role, location)
+        except Exception as e:
+            error = str(e) or type(e).__name__
+            raise
+        finally:
+            with call.lock:
+                call.finished = True
+                # A timed-out call was already recorded by the aggregator
+                if not call.timed_out:
+                    call.provider.stats.record(time.monotonic() - call.started, error=error)
+
+    def _expire(self, future, call: _ProviderCall, now: float) -> Optional[str]:
+        """Give up on a call past its deadline and return why; None if it finished just in time"""
+        provider = call.provider
+        if future.cancel():
+            provider.stats.record_queue_timeout()
+            logger.warning(f"Job provider {provider.name} timed out waiting for a worker")
+            return "no worker was free"
+        with call.lock:
+            if call.finished:
+                return None
+            call.timed_out = True
+        # The call keeps running in its thread; its result is ignored
+        provider.stats.record(now - (call.started or now), error="timeout", timed_out=True)
+        logger.warning(f"Job provider {provider.name} timed out after {provider.max_duration():g}s")
+        return "timed out"
+
+    def iter_results(self, job_role: str, location: str) -> Iterator[Tuple[str, List[Dict]]]:
+        """Yield (provider name, normalized jobs) as each provider finishes.
+
+        Providers that fail or exceed their deadline are logged and skipped.
+        If none succeeds, the last AdmissionError is raised when every
+        provider failed on admission (rate limit or open circuit), and
+        ProvidersUnavailableError otherwise, so the caller can tell an outage
+        from a search with no matches.
+        """
+        active = [provider for provider in self.providers if provider.is_configured()]
+        if not active:
+            logger.error("No job providers configured (set RAPIDAPI_KEY or JOB_FEED_PATH)")
+            raise ProvidersUnavailableError({})
+
+        started = time.monotonic()
+        pending = {}
+        for provider in active:
+            call = _ProviderCall(provider)
+            pending[self._executor.submit(self._call, call, job_role, location)] = call
+        deadlines = {future: started + call.provider.max_duration() for future, call in pending.items()}
+        succeeded = 0
+        failures: Dict[str, str] = {}
+        admission_errors: List[AdmissionError] = []
+
+        while pending:
+            now = time.monotonic()
+            for future in [f for f in pending if deadlines[f] <= now and not f.done()]:
+                reason = self._expire(future, pending[future], now)
+                if reason is not None:
+                    failures[pending.pop(future).provider.name] = reason
+            if not pending:
+                break
+
+            done, _ = wait(list(pending), timeout=max(min(deadlines[f] for f in pending) - now, 0),
+                           return_when=FIRST_COMPLETED)
+            for future in done:
+                provider = pending.pop(future).provider
+                try:
+                    jobs = future.result()
+                except AdmissionError as e:
+                    admission_errors.append(e)
+                    failures[provider.name] = str(e)
+                    logger.warning(f"Job provider {provider.name} not admitted: {e}")
+                    continue
+                except Exception as e:
+                    failures[provider.name] = "request failed"
+                    logger.error(f"Job provider {provider.name} failed: {e}")
+                    continue
+                succeeded += 1
+                logger.info(f"Job provider {provider.name} returned {len(jobs)} jobs")
+                yield provider.name, jobs
+
+        if not succeeded:
+            if admission_errors and len(admission_errors) == len(failures):
+                raise admission_errors[-1]
+            raise ProvidersUnavailableError(failures)
+
+    def search(self, job_role: str, location: str,
+               on_partial: Optional[Callable[[str, List[Dict]], None]] = None) -> List[Dict]:
+        """Merge all provider results, calling `on_partial(provider, merged)` after each arrives"""
+        merged: List[Dict] = []
+        seen = set()
+        for provider_name, jobs in self.iter_results(job_role, location):
+            for job in jobs:
+                key = dedupe_key(job)
+                if key in seen:
+                    continue
+                seen.add(key)
+                merged.append(job)
+            if on_partial is not None:
+                on_partial(provider_name, merged)
+        return merged
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        return [
+            {"provider": provider.name, "configured": provider.is_configured(), **provider.stats.snapshot()}
+            for provider in self.providers
+        ]
+
+
+_aggregator: Optional[JobAggregator] = None
+_aggregator_lock = threading.Lock()
+
+
+def get_job_aggregator() -> JobAggregator:
+    """Return the process-wide aggregator, creating it on first use"""
+    global _aggregator
+    with _aggregator_lock:
+        if _aggregator is None:
+            providers: List[JobProvider] = [
+                JSearchProvider(timeout=float(os.getenv("JSEARCH_TIMEOUT", "30")))
+            ]
+            feed = os.getenv("JOB_FEED_PATH")
+            if feed:
+                providers.append(LocalFeedProvider(feed, timeout=float(os.getenv("JOB_FEED_TIMEOUT", "5"))))
+            _aggregator = JobAggregator(providers)
+        return _aggregator
@@ -0,0 +1,253 @@
+"""Speculative tailoring for the top-ranked jobs.
+
+Users almost always pick one of the first few search results and then click
+"Tailor Resume". When speculation is enabled, as soon as a resume and a job
+list are both available the top-K jobs are tailored in the background, within
+a per-session token budget. Clicking "Tailor Resume" on one of those jobs then
+returns the prefetched result (or waits for the in-flight one) instead of
+starting a new LLM call. A job whose speculative call has not started yet is
+cancelled and tailored directly instead, since it may be queued behind other
+sessions' speculative work.
+
+Results are keyed by a hash of the job description and resume text, so a new
+search or an edited resume evicts everything that no longer applies. Hit and
+waste counters are kept per session and process-wide for tuning K.
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from admission import AdmissionError
+
+logger = logging.getLogger(__name__)
+
+CHARS_PER_TOKEN = 4
+# Upper bound for K; also the maximum of the sidebar slider
+MAX_TOP_K = 5
+
+# Settings are read when first needed, not at import time, so values from
+# the .env file (loaded after this module is imported) are honoured.
+
+
+def default_top_k() -> int:
+    """SPECULATIVE_TOP_K clamped to 1..MAX_TOP_K"""
+    top_k = int(os.getenv("SPECULATIVE_TOP_K", "3"))
+    return min(max(top_k, 1), MAX_TOP_K)
+
+
+def default_token_budget() -> int:
+    return int(os.getenv("SPECULATIVE_TOKEN_BUDGET", "20000"))
+
+
+def result_ttl() -> float:
+    return float(os.getenv("SPECULATIVE_RESULT_TTL", "1800"))
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Return the process-wide speculation pool, creating it on first use"""
+    # One pool for the whole process so speculation never takes more than a
+    # few OpenAI slots away from interactive requests.
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=int(os.getenv("SPECULATIVE_WORKERS", "2")),
+                thread_name_prefix="speculative-tailor",
+            )
+        return _executor
+
+
+def estimate_tokens(job_description: str, resume_text: str) -> int:
+    """Rough token cost of one tailoring call: prompt plus a resume-sized answer"""
+    return (len(job_description) + 2 * len(resume_text)) // CHARS_PER_TOKEN
+
+
+def speculation_key(job_description: str, resume_text: str) -> str:
+    digest = hashlib.sha256()
+    digest.update(job_description.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(resume_text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class SpeculationStats:
+    """Thread-safe hit/miss counters"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {
+            "submitted": 0,
+            "hits": 0,
+            "late_hits": 0,
+            "misses": 0,
+            "evicted": 0,
+            "failed": 0,
+            "wasted_tokens": 0,
+        }
+
+    def add(self, key: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[key] += amount
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+        served = counters["hits"] + counters["late_hits"]
+        lookups = served + counters["misses"]
+        counters["hit_rate"] = round(served / lookups, 3) if lookups else 0.0
+        return counters
+
+
+# Aggregated over every session in this process
+global_stats = SpeculationStats()
+
+
+class _Entry:
+    def __init__(self, future: Future, tokens: int, rank: int):
+        self.future = future
+        self.tokens = tokens
+        self.rank = rank
+        self.created_at = time.monotonic()
+
+
+class SpeculativeTailor:
+    """Per-session speculative tailoring state.
+
+    `generate(job_description, resume_text)` must not touch Streamlit or
+    session state; it runs on a background thread.
+    """
+
+    def __init__(self, generate: Callable[[str, str], str],
+                 top_k: Optional[int] = None, token_budget: Optional[int] = None):
+        self.generate = generate
+        self.top_k = top_k if top_k is not None else default_top_k()
+        self.token_budget = token_budget if token_budget is not None else default_token_budget()
+        self.enabled = False
+        self.tokens_reserved = 0
+        self.stats = SpeculationStats()
+        self._entries: Dict[str, _Entry] = {}
+        # Keys already served, so a rerun does not speculate on them again
+        self._taken: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def _count(self, key: str, amount: int = 1) -> None:
+        self.stats.add(key, amount)
+        global_stats.add(key, amount)
+
+    def _run(self, key: str, job_description: str, resume_text: str) -> str:
+        try:
+            return self.generate(job_description, resume_text)
+        except AdmissionError:
+            # Never reached the provider, so nothing was spent
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self.tokens_reserved -= entry.tokens
+                    entry.tokens = 0
+            raise
+        except Exception as e:
+            logger.warning(f"Speculative tailoring failed: {e}")
+            raise
+
+    def _discard(self, key: str) -> None:
+        """Drop an entry that will not be used (lock must be held)"""
+        entry = self._entries.pop(key)
+        if entry.future.cancel():
+            # Never started: give the budget back
+            self.tokens_reserved -= entry.tokens
+        else:
+            self._count("wasted_tokens", entry.tokens)
+        self._count("evicted")
+
+    def _evict_expired(self) -> None:
+        now = time.monotonic()
+        ttl = result_ttl()
+        for key in [k for k, e in self._entries.items() if now - e.created_at > ttl]:
+            self._discard(key)
+
+    def prime(self, jobs: List[Dict], resume_text: str) -> int:
+        """Start background tailoring for the top-K jobs; returns how many were queued"""
+        if not self.enabled or not resume_text.strip():
+            return 0
+        wanted = {}
+        for rank, job in enumerate(jobs[:self.top_k]):
+            job_description = job.get('job_description', '')
+            if job_description:
+                wanted[speculation_key(job_description, resume_text)] = (rank, job_description)
+
+        submitted = 0
+        with self._lock:
+            self._evict_expired()
+            for key in [k for k in self._entries if k not in wanted]:
+                self._discard(key)
+            self._taken &= wanted.keys()
+            for key, (rank, job_description) in sorted(wanted.items(), key=lambda item: item[1][0]):
+                if key in self._entries or key in self._taken:
+                    continue
+                tokens = estimate_tokens(job_description, resume_text)
+                if self.tokens_reserved + tokens > self.token_budget:
+                    logger.info(f"Speculative token budget exhausted; skipping job rank {rank}")
+                    break
+                future = get_executor().submit(self._run, key, job_description, resume_text)
+                self._entries[key] = _Entry(future, tokens, rank)
+                self.tokens_reserved += tokens
+                submitted += 1
+        if submitted:
+            self._count("submitted", submitted)
+        return submitted
+
+    def take(self, job_description: str, resume_text: str) -> Optional[str]:
+        """Return the speculative result for this job, or None on a miss.
+
+        A call that is already running is waited for. One that is still
+        queued is cancelled and its tokens refunded, so the caller makes the
+        call directly instead of waiting behind other speculative work.
+        """
+        if not self.enabled:
+            return None
+        key = speculation_key(job_description, resume_text)
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            self._taken.add(key)
+            if entry is not None and entry.future.cancel():
+                self.tokens_reserved -= entry.tokens
+                entry = None
+        if entry is None:
+            self._count("misses")
+            return None
+
+        ready = entry.future.done()
+        try:
+            result = entry.future.result()
+        except (CancelledError, Exception):
+            self._count("failed")
+            self._count("misses")
+            return None
+        self._count("hits" if ready else "late_hits")
+        return result
+
+    def evict_all(self) -> None:
+        with self._lock:
+            for key in list(self._entries):
+                self._discard(key)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = sum(1 for entry in self._entries.values() if not entry.future.done())
+            ready = len(self._entries) - pending
+            reserved = self.tokens_reserved
+        return {
+            **self.stats.snapshot(),
+            "pending": pending,
+            "ready": ready,
+            "tokens_reserved": reserved,
+            "token_budget": self.token_budget,
+        }
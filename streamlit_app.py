@@ -1,25 +1,50 @@
 import streamlit as st
 import os
-import json
-import requests
-import PyPDF2
-import io
-from fpdf import FPDF
-from crewai import Agent, Task, Crew, Process
-from langchain_openai import ChatOpenAI
+import re
+import importlib
+import threading
+from functools import cached_property
 from typing import List, Dict, Any
-import tempfile
-import base64
 import logging
-from dotenv import load_dotenv
+from admission import AdmissionError, ProviderOverloadedError, get_admission_controller, is_overload_error
+import export
+from job_providers import ProvidersUnavailableError, get_job_aggregator
+from speculation import MAX_TOP_K, SpeculativeTailor, default_top_k, global_stats as speculation_stats
 
-# Load environment variables from .env file
-load_dotenv()
+# Heavy dependencies (crewai, langchain_openai, PyPDF2, fpdf) are imported on
+# first use so a fresh replica can render its first page without loading them.
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+REQUIRED_ENV_VARS = ("OPENAI_API_KEY", "RAPIDAPI_KEY")
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+HEAVY_MODULES = ("langchain_openai", "crewai", "PyPDF2", "fpdf")
+
+HEADER_HTML = """
+<div class="main-header">
+    <h1>🚀 Job Application Crew</h1>
+    <p>AI-powered job search, resume tailoring, and cover letter generation</p>
+</div>
+"""
+
+STEP_INDICATOR_HTML = """
+<div class="step-indicator">
+    <div class="step active">1</div>
+    <div class="step">2</div>
+    <div class="step">3</div>
+    <div class="step">4</div>
+</div>
+"""
+
+FOOTER_HTML = """
+<div style="text-align: center; padding: 2rem; margin-top: 2rem; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; border-radius: 15px;">
+    <h3 style="margin: 0 0 1rem 0;">🎉 Your Job Application Crew is Ready!</h3>
+    <p style="margin: 0; opacity: 0.9;">Powered by AI • Built with CrewAI & Streamlit</p>
+</div>
+"""
+
 # Page configuration
 st.set_page_config(
     page_title="Job Application Crew",
@@ -28,201 +53,46 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Custom CSS for beautiful styling
-st.markdown("""
-<style>
-/* Main container styling */
-.main {
-    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-    min-height: 100vh;
-    font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-}
-
-/* Header styling */
-.main-header {
-    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-    color: white;
-    padding: 2rem;
-    text-align: center;
-    border-radius: 15px;
-    margin-bottom: 2rem;
-    box-shadow: 0 10px 30px rgba(0,0,0,0.2);
-}
-
-.main-header h1 {
-    font-size: 3rem;
-    margin: 0;
-    font-weight: 700;
-    text-shadow: 2px 2px 4px rgba(0,0,0,0.3);
-}
-
-.main-header p {
-    font-size: 1.2rem;
-    margin: 0.5rem 0 0 0;
-    opacity: 0.9;
-}
-
-/* Card styling */
-.job-card {
-    background: white;
-    border-radius: 15px;
-    padding: 1.5rem;
-    margin: 1rem 0;
-    box-shadow: 0 5px 15px rgba(0,0,0,0.1);
-    border-left: 5px solid #667eea;
-    transition: all 0.3s ease;
-}
-
-.job-card:hover {
-    transform: translateY(-3px);
-    box-shadow: 0 10px 25px rgba(0,0,0,0.15);
-}
-
-.job-title {
-    color: #2c3e50;
-    font-size: 1.4rem;
-    font-weight: 700;
-    margin-bottom: 0.5rem;
-}
-
-.job-company {
-    color: #7f8c8d;
-    font-size: 1.1rem;
-    font-weight: 600;
-    margin-bottom: 0.5rem;
-}
-
-.job-location {
-    color: #34495e;
-    font-size: 1rem;
-    margin-bottom: 1rem;
-}
+@st.cache_resource(show_spinner=False)
+def load_environment() -> List[str]:
+    """Load the .env file once per process and return missing required variables"""
+    from dotenv import load_dotenv
 
-.job-description {
-    color: #2c3e50;
-    line-height: 1.6;
-    margin-bottom: 1rem;
-}
+    load_dotenv()
+    return [name for name in REQUIRED_ENV_VARS if not os.getenv(name)]
 
-/* Form styling */
-.form-container {
-    background: white;
-    border-radius: 15px;
-    padding: 2rem;
-    box-shadow: 0 5px 15px rgba(0,0,0,0.1);
-    margin-bottom: 1rem;
-}
+@st.cache_resource(show_spinner=False)
+def load_css() -> str:
+    """Read and minify the stylesheet once per process"""
+    with open(os.path.join(STATIC_DIR, "styles.css"), encoding="utf-8") as f:
+        css = f.read()
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.DOTALL)
+    css = re.sub(r"\s+", " ", css).strip()
+    return f"<style>{css}</style>"
 
-.form-title {
-    color: #2c3e50;
-    font-size: 1.5rem;
-    font-weight: 700;
-    margin-bottom: 1rem;
-    text-align: center;
-}
-
-/* Button styling */
-.stButton > button {
-    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-    color: white;
-    border: none;
-    padding: 12px 24px;
-    border-radius: 25px;
-    font-weight: 600;
-    transition: all 0.3s ease;
-    cursor: pointer;
-}
-
-.stButton > button:hover {
-    transform: translateY(-2px);
-    box-shadow: 0 5px 15px rgba(0,0,0,0.2);
-}
-
-/* Step indicators */
-.step-indicator {
-    display: flex;
-    justify-content: center;
-    align-items: center;
-    margin: 2rem 0;
-}
-
-.step {
-    width: 40px;
-    height: 40px;
-    border-radius: 50%;
-    background: #e0e0e0;
-    color: #666;
-    display: flex;
-    align-items: center;
-    justify-content: center;
-    font-weight: 700;
-    margin: 0 10px;
-    transition: all 0.3s ease;
-}
-
-.step.active {
-    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-    color: white;
-    transform: scale(1.1);
-}
-
-.step.completed {
-    background: linear-gradient(135deg, #4facfe 0%, #00f2fe 100%);
-    color: white;
-}
-
-/* Status messages */
-.status-success {
-    background: linear-gradient(135deg, #4facfe 0%, #00f2fe 100%);
-    color: white;
-    padding: 1rem;
-    border-radius: 10px;
-    margin: 1rem 0;
-    text-align: center;
-    font-weight: 600;
-}
+def _warm_heavy_imports() -> None:
+    """Import the heavy dependencies in the background after the first render"""
+    for module in HEAVY_MODULES:
+        try:
+            importlib.import_module(module)
+        except Exception as e:
+            logger.warning(f"Background import of {module} failed: {e}")
 
-.status-error {
-    background: linear-gradient(135deg, #ff6b6b 0%, #ee5a24 100%);
-    color: white;
-    padding: 1rem;
-    border-radius: 10px;
-    margin: 1rem 0;
-    text-align: center;
-    font-weight: 600;
-}
+@st.cache_resource(show_spinner=False)
+def start_import_warmup() -> threading.Thread:
+    """Start the background import warm-up once per process"""
+    thread = threading.Thread(target=_warm_heavy_imports, name="import-warmup", daemon=True)
+    thread.start()
+    return thread
 
-/* Responsive design */
-@media (max-width: 768px) {
-    .main-header h1 {
-        font-size: 2rem;
-    }
-    
-    .job-card {
-        padding: 1rem;
-    }
-    
-    .form-container {
-        padding: 1rem;
-    }
-}
-</style>
-""", unsafe_allow_html=True)
+# Streamlit drops elements that are not re-emitted on a rerun, so the style
+# tag is sent every run, but its contents are only built once per process.
+st.markdown(load_css(), unsafe_allow_html=True)
 
 class JobApplicationCrew:
     def __init__(self):
-        # Initialize OpenAI LLM
-        self.llm = ChatOpenAI(
-            model="gpt-4o-mini",
-            temperature=0.7,
-            openai_api_key=os.getenv("OPENAI_API_KEY")
-        )
-        
-        # Initialize agents
-        self.job_finder = self._create_job_finder_agent()
-        self.resume_tailor = self._create_resume_tailor_agent()
-        self.cover_letter_writer = self._create_cover_letter_writer_agent()
-        self.reviewer = self._create_reviewer_agent()
+        # The LLM and agents are built on first use (see the cached properties
+        # below) so creating a session does not import crewai or langchain.
         
         # Store application state
         self.job_listings = []
@@ -231,8 +101,37 @@ class JobApplicationCrew:
         self.cover_letter = ""
         self.reviewed_resume = ""
         self.reviewed_cover_letter = ""
+    
+    @cached_property
+    def llm(self):
+        """OpenAI LLM shared by all agents"""
+        from langchain_openai import ChatOpenAI
+        
+        return ChatOpenAI(
+            model="gpt-4o-mini",
+            temperature=0.7,
+            openai_api_key=os.getenv("OPENAI_API_KEY")
+        )
+    
+    @cached_property
+    def job_finder(self):
+        return self._create_job_finder_agent()
+    
+    @cached_property
+    def resume_tailor(self):
+        return self._create_resume_tailor_agent()
+    
+    @cached_property
+    def cover_letter_writer(self):
+        return self._create_cover_letter_writer_agent()
+    
+    @cached_property
+    def reviewer(self):
+        return self._create_reviewer_agent()
         
     def _create_job_finder_agent(self):
+        from crewai import Agent
+        
         return Agent(
             role="Job Search Specialist",
             goal="Find relevant job opportunities using the JSearch API",
@@ -244,6 +143,8 @@ class JobApplicationCrew:
         )
     
     def _create_resume_tailor_agent(self):
+        from crewai import Agent
+        
         return Agent(
             role="Resume Tailoring Expert",
             goal="Customize resumes to match specific job requirements",
@@ -255,6 +156,8 @@ class JobApplicationCrew:
         )
     
     def _create_cover_letter_writer_agent(self):
+        from crewai import Agent
+        
         return Agent(
             role="Cover Letter Writer",
             goal="Create compelling, personalized cover letters",
@@ -266,6 +169,8 @@ class JobApplicationCrew:
         )
     
     def _create_reviewer_agent(self):
+        from crewai import Agent
+        
         return Agent(
             role="Document Reviewer",
             goal="Review and improve resumes and cover letters for quality and accuracy",
@@ -276,35 +181,24 @@ class JobApplicationCrew:
             llm=self.llm
         )
     
-    def search_jobs(self, job_role: str, location: str) -> List[Dict]:
-        """Search for jobs using JSearch API"""
+    def _kickoff(self, crew):
+        """Run a crew through OpenAI admission control"""
+        try:
+            with get_admission_controller().admit("openai"):
+                return crew.kickoff()
+        except AdmissionError:
+            raise
+        except Exception as e:
+            # Rate limits and 5xx errors get the same retry message as rejections
+            if is_overload_error(e):
+                raise ProviderOverloadedError("openai") from e
+            raise
+    
+    def search_jobs(self, job_role: str, location: str, on_partial=None) -> List[Dict]:
+        """Search for jobs across all configured providers in parallel"""
         try:
-            # Check if API key is available
-            api_key = os.getenv("RAPIDAPI_KEY")
-            if not api_key:
-                logger.error("RAPIDAPI_KEY not found in environment variables")
-                return []
-            
-            # JSearch API endpoint
-            url = "https://jsearch.p.rapidapi.com/search"
-            
-            headers = {
-                "X-RapidAPI-Key": api_key,
-                "X-RapidAPI-Host": "jsearch.p.rapidapi.com"
-            }
-            
-            params = {
-                "query": f"{job_role} in {location}",
-                "page": "1",
-                "num_pages": "10"
-            }
-            
             logger.info(f"Searching for jobs: {job_role} in {location}")
-            response = requests.get(url, headers=headers, params=params, timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
-            jobs = data.get("data", [])
+            jobs = get_job_aggregator().search(job_role, location, on_partial=on_partial)
             
             # Store job listings
             self.job_listings = jobs
@@ -312,15 +206,22 @@ class JobApplicationCrew:
             
             return jobs
             
-        except requests.exceptions.RequestException as e:
-            logger.error(f"API request failed: {e}")
-            return []
+        except (AdmissionError, ProvidersUnavailableError):
+            # Let the UI tell the user the providers are busy or down
+            raise
         except Exception as e:
             logger.error(f"Error searching jobs: {e}")
             return []
     
     def tailor_resume(self, job_description: str, original_resume: str) -> str:
         """Tailor resume to specific job"""
+        self.tailored_resume = self.generate_tailored_resume(job_description, original_resume)
+        return self.tailored_resume
+    
+    def generate_tailored_resume(self, job_description: str, original_resume: str) -> str:
+        """Run the resume tailoring crew without touching application state"""
+        from crewai import Crew, Task
+        
         task = Task(
             description=f"""
             Analyze the job description and tailor the resume to match the requirements.
@@ -347,12 +248,13 @@ class JobApplicationCrew:
             verbose=True
         )
         
-        result = crew.kickoff()
-        self.tailored_resume = str(result)
-        return self.tailored_resume
+        result = self._kickoff(crew)
+        return str(result)
     
     def write_cover_letter(self, job_description: str, tailored_resume: str) -> str:
         """Write cover letter for specific job"""
+        from crewai import Crew, Task
+        
         task = Task(
             description=f"""
             Write a compelling cover letter for this job opportunity.
@@ -380,12 +282,14 @@ class JobApplicationCrew:
             verbose=True
         )
         
-        result = crew.kickoff()
+        result = self._kickoff(crew)
         self.cover_letter = str(result)
         return self.cover_letter
     
     def review_documents(self, resume: str, cover_letter: str) -> tuple:
         """Review and improve both documents"""
+        from crewai import Crew, Task
+        
         task = Task(
             description=f"""
             Review and improve both the resume and cover letter for:
@@ -412,7 +316,7 @@ class JobApplicationCrew:
             verbose=True
         )
         
-        result = crew.kickoff()
+        result = self._kickoff(crew)
         
         # For simplicity, we'll use the result as both documents
         # In a more sophisticated implementation, you'd parse the result
@@ -424,44 +328,15 @@ class JobApplicationCrew:
     def create_pdf(self, content: str, filename: str) -> bytes:
         """Create PDF from text content"""
         try:
-            pdf = FPDF()
-            pdf.add_page()
-            pdf.set_font("Arial", size=12)
-            
-            # Split content into lines and add to PDF
-            lines = content.split('\n')
-            for line in lines:
-                # Clean up the line
-                line = line.strip()
-                if not line:
-                    pdf.ln(5)  # Add some space for empty lines
-                    continue
-                
-                # Handle long lines by wrapping
-                if len(line) > 80:
-                    words = line.split(' ')
-                    current_line = ""
-                    for word in words:
-                        if len(current_line + word) < 80:
-                            current_line += word + " "
-                        else:
-                            if current_line:
-                                pdf.cell(0, 10, current_line, ln=True)
-                            current_line = word + " "
-                    if current_line:
-                        pdf.cell(0, 10, current_line, ln=True)
-                else:
-                    pdf.cell(0, 10, line, ln=True)
-            
-            # Return PDF as bytes
-            return pdf.output(dest='S').encode('latin-1')
-            
+            return export.render(content, export.PDF, title=os.path.splitext(filename)[0])
         except Exception as e:
             logger.error(f"Error creating PDF: {e}")
             raise
 
 def extract_text_from_pdf(file) -> str:
     """Extract text from uploaded PDF file"""
+    import PyPDF2
+    
     try:
         pdf_reader = PyPDF2.PdfReader(file)
         text = ""
@@ -471,6 +346,40 @@ def extract_text_from_pdf(file) -> str:
     except Exception as e:
         return f"Error reading PDF: {str(e)}"
 
+EXPORT_DOCUMENTS = (
+    ("tailored_resume", "Resume"),
+    ("cover_letter", "Cover Letter"),
+    ("reviewed_resume", "Reviewed Resume"),
+    ("reviewed_cover_letter", "Reviewed Cover Letter"),
+)
+
+def export_download_button(label: str, content: str, file_stem: str):
+    """Format picker plus a download button; rendering is cached by content hash"""
+    formats = export.available_formats()
+    fmt = st.radio(
+        f"{label} format",
+        formats,
+        format_func=export.FORMAT_LABELS.get,
+        horizontal=True,
+        key=f"export_format_{file_stem}"
+    )
+    try:
+        data = export.render(content, fmt, title=label)
+    except Exception as e:
+        st.error(f"Error creating {export.FORMAT_LABELS[fmt]}: {e}")
+        return
+    st.download_button(
+        label=f"📄 Download {label} ({export.FORMAT_LABELS[fmt]})",
+        data=data,
+        file_name=f"{file_stem}.{fmt}",
+        mime=export.MIME_TYPES[fmt],
+        key=f"download_{file_stem}"
+    )
+
+def generate_speculative_resume(job_description: str, resume_text: str) -> str:
+    """Background tailoring for speculation, on its own crew so no session state is shared"""
+    return JobApplicationCrew().generate_tailored_resume(job_description, resume_text)
+
 def main():
     # Initialize session state
     if 'crew_app' not in st.session_state:
@@ -500,23 +409,28 @@ def main():
     if 'reviewed_cover_letter' not in st.session_state:
         st.session_state.reviewed_cover_letter = ""
     
+    if 'speculator' not in st.session_state:
+        st.session_state.speculator = SpeculativeTailor(generate_speculative_resume)
+    
+    # Opt-in speculative tailoring of the top-ranked jobs
+    speculator = st.session_state.speculator
+    with st.sidebar:
+        st.subheader("⚡ Speculative Tailoring")
+        enabled = st.checkbox(
+            "Pre-tailor top jobs",
+            value=False,
+            help="Tailor your resume for the first few search results in the background so 'Tailor Resume' is instant. Uses extra OpenAI tokens."
+        )
+        speculator.top_k = st.slider("Jobs to pre-tailor", min_value=1, max_value=MAX_TOP_K, value=default_top_k())
+        if speculator.enabled and not enabled:
+            speculator.evict_all()
+        speculator.enabled = enabled
+    
     # Beautiful header
-    st.markdown("""
-    <div class="main-header">
-        <h1>🚀 Job Application Crew</h1>
-        <p>AI-powered job search, resume tailoring, and cover letter generation</p>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(HEADER_HTML, unsafe_allow_html=True)
     
     # Step indicator
-    st.markdown("""
-    <div class="step-indicator">
-        <div class="step active">1</div>
-        <div class="step">2</div>
-        <div class="step">3</div>
-        <div class="step">4</div>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(STEP_INDICATOR_HTML, unsafe_allow_html=True)
     
     # Main content
     tab1, tab2, tab3, tab4 = st.tabs(["🔍 Find Jobs", "📝 Tailor Resume", "💌 Cover Letter", "📋 Review & Export"])
@@ -534,15 +448,26 @@ def main():
         
         if st.button("🔍 Search Jobs", type="primary"):
             if job_role and location:
-                with st.spinner("Searching for jobs..."):
-                    jobs = st.session_state.crew_app.search_jobs(job_role, location)
-                    st.session_state.jobs = jobs
-                    st.session_state.job_search_completed = True
-                
-                if jobs:
-                    st.success(f"Found {len(jobs)} jobs!")
+                try:
+                    progress = st.empty()
+                    
+                    def show_partial(provider_name, merged):
+                        progress.info(f"Received results from {provider_name}: {len(merged)} jobs so far...")
+                    
+                    with st.spinner("Searching for jobs..."):
+                        jobs = st.session_state.crew_app.search_jobs(job_role, location, on_partial=show_partial)
+                        progress.empty()
+                        st.session_state.jobs = jobs
+                        st.session_state.job_search_completed = True
+                except AdmissionError as e:
+                    st.warning(f"⏳ {e}")
+                except ProvidersUnavailableError as e:
+                    st.error(str(e))
                 else:
-                    st.error("No jobs found. Please try different search terms.")
+                    if jobs:
+                        st.success(f"Found {len(jobs)} jobs!")
+                    else:
+                        st.error("No jobs found. Please try different search terms.")
             else:
                 st.error("Please enter both job role and location.")
         
@@ -554,6 +479,7 @@ def main():
             for i, job in enumerate(st.session_state.jobs):
                 title = job.get('job_title', 'N/A')
                 company = job.get('employer_name', 'N/A')
+                source = job.get('job_source', '')
                 city = job.get('job_city', 'N/A')
                 state = job.get('job_state', 'N/A')
                 location_str = f"{city}, {state}" if city != 'N/A' and state != 'N/A' else (city if city != 'N/A' else 'Location not specified')
@@ -567,7 +493,7 @@ def main():
                 st.markdown(f"""
                 <div class="job-card">
                     <h3 class="job-title">{title}</h3>
-                    <p class="job-company">{company}</p>
+                    <p class="job-company">{company}{f" · via {source}" if source else ""}</p>
                     <p class="job-location">📍 {location_str}</p>
                     <div class="job-description">{description}</div>
                     <p style="margin: 8px 0 0 0;">
@@ -633,16 +559,27 @@ def main():
             resume_text = st.text_area("Paste your resume text here:", height=200)
             st.session_state.resume_text = resume_text
         
+        # Start tailoring the top-ranked jobs while the user picks one
+        if st.session_state.jobs and not st.session_state.resume_text.startswith("Error reading PDF"):
+            speculator.prime(st.session_state.jobs, st.session_state.resume_text)
+        
         if st.button("✂️ Tailor Resume", type="primary"):
             if st.session_state.resume_text and st.session_state.selected_job:
-                with st.spinner("Tailoring your resume..."):
-                    job_description = st.session_state.selected_job.get('job_description', '')
-                    tailored_resume = st.session_state.crew_app.tailor_resume(job_description, st.session_state.resume_text)
-                    st.session_state.tailored_resume = tailored_resume
-                    st.session_state.current_step = 3
-                
-                st.success("Resume tailored successfully!")
-                st.text_area("Tailored Resume", value=tailored_resume, height=300)
+                try:
+                    with st.spinner("Tailoring your resume..."):
+                        job_description = st.session_state.selected_job.get('job_description', '')
+                        tailored_resume = speculator.take(job_description, st.session_state.resume_text)
+                        if tailored_resume is None:
+                            tailored_resume = st.session_state.crew_app.tailor_resume(job_description, st.session_state.resume_text)
+                        else:
+                            st.session_state.crew_app.tailored_resume = tailored_resume
+                        st.session_state.tailored_resume = tailored_resume
+                        st.session_state.current_step = 3
+                except AdmissionError as e:
+                    st.warning(f"⏳ {e}")
+                else:
+                    st.success("Resume tailored successfully!")
+                    st.text_area("Tailored Resume", value=tailored_resume, height=300)
             else:
                 st.error("Please provide resume text and select a job first.")
     
@@ -656,14 +593,17 @@ def main():
         
         if st.button("✍️ Generate Cover Letter", type="primary"):
             if st.session_state.tailored_resume and st.session_state.selected_job:
-                with st.spinner("Generating cover letter..."):
-                    job_description = st.session_state.selected_job.get('job_description', '')
-                    cover_letter = st.session_state.crew_app.write_cover_letter(job_description, st.session_state.tailored_resume)
-                    st.session_state.cover_letter = cover_letter
-                    st.session_state.current_step = 4
-                
-                st.success("Cover letter generated successfully!")
-                st.text_area("Cover Letter", value=cover_letter, height=300)
+                try:
+                    with st.spinner("Generating cover letter..."):
+                        job_description = st.session_state.selected_job.get('job_description', '')
+                        cover_letter = st.session_state.crew_app.write_cover_letter(job_description, st.session_state.tailored_resume)
+                        st.session_state.cover_letter = cover_letter
+                        st.session_state.current_step = 4
+                except AdmissionError as e:
+                    st.warning(f"⏳ {e}")
+                else:
+                    st.success("Cover letter generated successfully!")
+                    st.text_area("Cover Letter", value=cover_letter, height=300)
             else:
                 st.error("Please tailor your resume first.")
     
@@ -678,24 +618,18 @@ def main():
                 st.text_area("Resume", value=st.session_state.tailored_resume, height=200)
                 
                 if st.button("🔍 Review Resume", type="primary"):
-                    with st.spinner("Reviewing resume..."):
-                        reviewed_resume, _ = st.session_state.crew_app.review_documents(st.session_state.tailored_resume, st.session_state.cover_letter)
-                        st.session_state.reviewed_resume = reviewed_resume
-                    st.success("Resume reviewed!")
-                    st.text_area("Reviewed Resume", value=reviewed_resume, height=200)
-                
-                # Download resume PDF
-                if st.button("📄 Download Resume PDF"):
                     try:
-                        pdf_bytes = st.session_state.crew_app.create_pdf(st.session_state.tailored_resume, "tailored_resume.pdf")
-                        st.download_button(
-                            label="Download Resume PDF",
-                            data=pdf_bytes,
-                            file_name="tailored_resume.pdf",
-                            mime="application/pdf"
-                        )
-                    except Exception as e:
-                        st.error(f"Error creating PDF: {e}")
+                        with st.spinner("Reviewing resume..."):
+                            reviewed_resume, _ = st.session_state.crew_app.review_documents(st.session_state.tailored_resume, st.session_state.cover_letter)
+                            st.session_state.reviewed_resume = reviewed_resume
+                    except AdmissionError as e:
+                        st.warning(f"⏳ {e}")
+                    else:
+                        st.success("Resume reviewed!")
+                        st.text_area("Reviewed Resume", value=reviewed_resume, height=200)
+                
+                # Download resume
+                export_download_button("Resume", st.session_state.tailored_resume, "tailored_resume")
             else:
                 st.warning("No tailored resume available.")
         
@@ -705,46 +639,68 @@ def main():
                 st.text_area("Cover Letter", value=st.session_state.cover_letter, height=200)
                 
                 if st.button("🔍 Review Cover Letter", type="primary"):
-                    with st.spinner("Reviewing cover letter..."):
-                        _, reviewed_cover_letter = st.session_state.crew_app.review_documents(st.session_state.tailored_resume, st.session_state.cover_letter)
-                        st.session_state.reviewed_cover_letter = reviewed_cover_letter
-                    st.success("Cover letter reviewed!")
-                    st.text_area("Reviewed Cover Letter", value=reviewed_cover_letter, height=200)
-                
-                # Download cover letter PDF
-                if st.button("📄 Download Cover Letter PDF"):
                     try:
-                        pdf_bytes = st.session_state.crew_app.create_pdf(st.session_state.cover_letter, "cover_letter.pdf")
-                        st.download_button(
-                            label="Download Cover Letter PDF",
-                            data=pdf_bytes,
-                            file_name="cover_letter.pdf",
-                            mime="application/pdf"
-                        )
-                    except Exception as e:
-                        st.error(f"Error creating PDF: {e}")
+                        with st.spinner("Reviewing cover letter..."):
+                            _, reviewed_cover_letter = st.session_state.crew_app.review_documents(st.session_state.tailored_resume, st.session_state.cover_letter)
+                            st.session_state.reviewed_cover_letter = reviewed_cover_letter
+                    except AdmissionError as e:
+                        st.warning(f"⏳ {e}")
+                    else:
+                        st.success("Cover letter reviewed!")
+                        st.text_area("Reviewed Cover Letter", value=reviewed_cover_letter, height=200)
+                
+                # Download cover letter
+                export_download_button("Cover Letter", st.session_state.cover_letter, "cover_letter")
             else:
                 st.warning("No cover letter available.")
     
+        # Bundle every generated document in every format
+        bundle_documents = [
+            (stem, st.session_state[stem], title)
+            for stem, title in EXPORT_DOCUMENTS
+            if st.session_state[stem]
+        ]
+        if bundle_documents:
+            st.markdown("---")
+            st.subheader("📦 Download Everything")
+            if st.button("📦 Prepare ZIP Bundle"):
+                try:
+                    with st.spinner("Building ZIP bundle..."):
+                        # download_button holds its data in memory, so build bytes directly
+                        bundle_bytes = export.build_bundle(bundle_documents, export.available_formats())
+                    st.download_button(
+                        label="Download ZIP Bundle",
+                        data=bundle_bytes,
+                        file_name="job_application_documents.zip",
+                        mime=export.MIME_TYPES["zip"]
+                    )
+                except Exception as e:
+                    st.error(f"Error creating ZIP bundle: {e}")
+    
+    # Upstream admission metrics (shared by all sessions in this process)
+    with st.sidebar:
+        with st.expander("⚙️ Upstream Status"):
+            st.table(get_admission_controller().snapshot())
+        with st.expander("🔌 Job Providers"):
+            st.table(get_job_aggregator().snapshot())
+        with st.expander("⚡ Speculation Stats"):
+            st.write("**This session:**")
+            st.json(speculator.snapshot())
+            st.write("**All sessions:**")
+            st.json(speculation_stats.snapshot())
+    
     # Beautiful footer
-    st.markdown("""
-    <div style="text-align: center; padding: 2rem; margin-top: 2rem; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; border-radius: 15px;">
-        <h3 style="margin: 0 0 1rem 0;">🎉 Your Job Application Crew is Ready!</h3>
-        <p style="margin: 0; opacity: 0.9;">Powered by AI • Built with CrewAI & Streamlit</p>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(FOOTER_HTML, unsafe_allow_html=True)
+    
+    # Load crewai/langchain/PDF libraries off the request path
+    start_import_warmup()
 
 if __name__ == "__main__":
-    # Check for required environment variables
-    missing_vars = []
-    
-    if not os.getenv("OPENAI_API_KEY"):
-        missing_vars.append("OPENAI_API_KEY")
-        st.error("❌ OPENAI_API_KEY not found in environment variables")
+    # Check for required environment variables (evaluated once per process)
+    missing_vars = load_environment()
     
-    if not os.getenv("RAPIDAPI_KEY"):
-        missing_vars.append("RAPIDAPI_KEY")
-        st.error("❌ RAPIDAPI_KEY not found in environment variables")
+    for name in missing_vars:
+        st.error(f"❌ {name} not found in environment variables")
     
     if missing_vars:
         st.error(f"⚠️ Missing environment variables: {', '.join(missing_vars)}")
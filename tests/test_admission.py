@@ -0,0 +1,229 @@
+import threading
+import time
+
+import pytest
+
+from admission import (
+    OVERLOAD,
+    SUCCESS,
+    AdaptiveLimiter,
+    AdmissionController,
+    CircuitBreaker,
+    CircuitOpenError,
+    QueueTimeoutError,
+    SQLiteSlotStore,
+    is_overload_error,
+)
+
+
+class StatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class RateLimitError(Exception):
+    pass
+
+
+def test_is_overload_error_by_status_and_name():
+    assert is_overload_error(StatusError(429))
+    assert is_overload_error(StatusError(503))
+    assert not is_overload_error(StatusError(400))
+    assert is_overload_error(RateLimitError())
+    assert not is_overload_error(ValueError("bad input"))
+
+
+def test_is_overload_error_follows_cause():
+    try:
+        try:
+            raise StatusError(429)
+        except StatusError as e:
+            raise RuntimeError("crew failed") from e
+    except RuntimeError as wrapped:
+        assert is_overload_error(wrapped)
+
+
+def test_limiter_additive_increase_and_multiplicative_decrease():
+    limiter = AdaptiveLimiter(initial_limit=4, max_limit=8)
+    # About +1 per window of `limit` successes
+    for _ in range(5):
+        assert limiter.acquire(0)
+        limiter.release(SUCCESS)
+    assert limiter.limit == 5
+
+    assert limiter.acquire(0)
+    limiter.release(OVERLOAD)
+    assert limiter.limit == 2
+
+    # Calls admitted one after another each see the previous decrease
+    for _ in range(10):
+        assert limiter.acquire(0)
+        limiter.release(OVERLOAD, limiter.epoch)
+    assert limiter.limit == limiter.min_limit
+
+
+def test_limiter_halves_once_for_a_concurrent_burst_of_overloads():
+    limiter = AdaptiveLimiter(initial_limit=16, max_limit=16)
+    epochs = []
+    for _ in range(16):
+        assert limiter.acquire(0)
+        epochs.append(limiter.epoch)
+    for epoch in epochs:
+        limiter.release(OVERLOAD, epoch)
+    assert limiter.limit == 8
+    assert limiter.snapshot()["in_flight"] == 0
+
+    # The next call admitted after the cut can cut again
+    assert limiter.acquire(0)
+    limiter.release(OVERLOAD, limiter.epoch)
+    assert limiter.limit == 4
+
+
+def test_limiter_rejects_when_full_and_queue_is_full():
+    limiter = AdaptiveLimiter(initial_limit=1, max_queue=0)
+    assert limiter.acquire(0)
+    assert not limiter.acquire(1)
+    limiter.release(SUCCESS)
+    assert limiter.acquire(0)
+
+
+def test_limiter_waiter_gets_released_slot():
+    limiter = AdaptiveLimiter(initial_limit=1)
+    assert limiter.acquire(0)
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(limiter.acquire(2)))
+    waiter.start()
+    time.sleep(0.05)
+    assert limiter.snapshot()["queue_depth"] == 1
+    limiter.release(SUCCESS)
+    waiter.join()
+    assert results == [True]
+    assert limiter.snapshot()["max_queue_depth"] == 1
+
+
+def test_breaker_opens_half_opens_and_closes():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    for _ in range(2):
+        retry_after, token = breaker.before_call()
+        assert retry_after is None
+        breaker.record(OVERLOAD, token)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.before_call()[0] is not None
+
+    time.sleep(0.06)
+    retry_after, probe = breaker.before_call()
+    assert retry_after is None
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # Only one probe at a time
+    assert breaker.before_call()[0] is not None
+    breaker.record(SUCCESS, probe)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_breaker_ignores_calls_admitted_before_it_opened():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    _, slow = breaker.before_call()
+    _, failing = breaker.before_call()
+    breaker.record(OVERLOAD, failing)
+    assert breaker.state == CircuitBreaker.OPEN
+
+    # A slow call from before the outage must not close the circuit
+    breaker.record(SUCCESS, slow)
+    assert breaker.state == CircuitBreaker.OPEN
+
+    time.sleep(0.06)
+    retry_after, probe = breaker.before_call()
+    assert retry_after is None
+    # ...nor free the half-open probe slot
+    breaker.record(SUCCESS, slow)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.before_call()[0] is not None
+    breaker.record(SUCCESS, probe)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_breaker_failed_probe_reopens():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    _, token = breaker.before_call()
+    breaker.record(OVERLOAD, token)
+    time.sleep(0.06)
+    retry_after, probe = breaker.before_call()
+    assert retry_after is None
+    breaker.record(OVERLOAD, probe)
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_controller_short_circuits_after_overloads():
+    controller = AdmissionController()
+    controller.register("api", failure_threshold=2, reset_timeout=60)
+    for _ in range(2):
+        with pytest.raises(StatusError):
+            with controller.admit("api"):
+                raise StatusError(429)
+    with pytest.raises(CircuitOpenError):
+        with controller.admit("api"):
+            pass
+    snapshot = controller.snapshot()[0]
+    assert snapshot["overloads"] == 2
+    assert snapshot["short_circuited"] == 1
+    assert snapshot["in_flight"] == 0
+
+
+def test_controller_burst_of_overloads_cuts_limit_once():
+    controller = AdmissionController()
+    controller.register("api", initial_limit=8, max_limit=8, failure_threshold=100)
+    barrier = threading.Barrier(8)
+
+    def call():
+        try:
+            with controller.admit("api"):
+                barrier.wait()
+                raise StatusError(429)
+        except StatusError:
+            pass
+
+    threads = [threading.Thread(target=call) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    snapshot = controller.snapshot()[0]
+    assert snapshot["overloads"] == 8
+    assert snapshot["limit"] == 4
+
+
+def test_controller_queue_timeout():
+    controller = AdmissionController()
+    controller.register("api", initial_limit=1, max_limit=1, queue_timeout=0.05)
+    with controller.admit("api"):
+        with pytest.raises(QueueTimeoutError):
+            with controller.admit("api"):
+                pass
+    assert controller.snapshot()[0]["rejected"] == 1
+
+
+def test_controller_get_registers_once_under_concurrency():
+    controller = AdmissionController()
+    barrier = threading.Barrier(8)
+    upstreams = []
+
+    def lookup():
+        barrier.wait()
+        upstreams.append(controller.get("new"))
+
+    threads = [threading.Thread(target=lookup) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(upstream) for upstream in upstreams}) == 1
+
+
+def test_sqlite_slots_are_shared_and_released(tmp_path):
+    store = SQLiteSlotStore(str(tmp_path / "slots.db"))
+    first = store.try_acquire("api", limit=1)
+    assert first is not None
+    assert SQLiteSlotStore(store.path).try_acquire("api", limit=1) is None
+    store.release(first)
+    assert store.try_acquire("api", limit=1) is not None
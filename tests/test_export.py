@@ -0,0 +1,93 @@
+import io
+import zipfile
+
+import export
+
+RESUME = """Jane Doe
+jane@example.com | +1 555 123 4567
+
+PROFESSIONAL SUMMARY
+Engineer with **8 years** of experience.
+
+## Achievements
+1. Cut infrastructure costs by 20%
+2) Led the database migration
+
+Skills:
+- Python
+- Go
+"""
+
+
+def test_parse_document_structure():
+    doc = export.parse_document(RESUME, "Resume")
+    assert doc.contact == ("Jane Doe", "jane@example.com | +1 555 123 4567")
+    kinds = [(block.kind, block.text) for block in doc.blocks]
+    assert kinds == [
+        ("heading", "PROFESSIONAL SUMMARY"),
+        ("paragraph", "Engineer with 8 years of experience."),
+        ("heading", "Achievements"),
+        ("numbered", "Cut infrastructure costs by 20%"),
+        ("numbered", "Led the database migration"),
+        ("heading", "Skills"),
+        ("bullet", "Python"),
+        ("bullet", "Go"),
+    ]
+    assert [block.number for block in doc.blocks if block.kind == "numbered"] == [1, 2]
+
+
+def test_text_without_contact_details_has_no_contact_block():
+    doc = export.parse_document("Dear hiring manager,\nI am writing to apply.")
+    assert doc.contact == ()
+
+
+def test_markdown_keeps_numbering():
+    markdown = export.render(RESUME, export.MARKDOWN).decode("utf-8")
+    assert markdown.startswith("# Jane Doe\n")
+    assert "1. Cut infrastructure costs by 20%\n2. Led the database migration" in markdown
+    assert "- Python\n- Go" in markdown
+
+
+def test_render_is_cached_by_content_hash(monkeypatch):
+    monkeypatch.setattr(export, "render_cache", export.RenderCache())
+    calls = []
+    monkeypatch.setitem(export.RENDERERS, export.MARKDOWN,
+                        lambda doc: calls.append(doc) or b"rendered")
+    assert export.render("same text", export.MARKDOWN) == b"rendered"
+    assert export.render("same text", export.MARKDOWN) == b"rendered"
+    export.render("other text", export.MARKDOWN)
+    assert len(calls) == 2
+
+
+def test_render_cache_evicts_least_recently_used():
+    cache = export.RenderCache(max_bytes=10)
+    cache.put(("md", "a"), b"12345")
+    cache.put(("md", "b"), b"12345")
+    cache.get(("md", "a"))
+    cache.put(("md", "c"), b"12345")
+    assert cache.get(("md", "b")) is None
+    assert cache.get(("md", "a")) == b"12345"
+
+
+def test_bundle_contains_every_document_and_format():
+    documents = [("resume", RESUME, "Resume"), ("cover_letter", "Dear team,\nHello.", "Cover Letter")]
+    archive = zipfile.ZipFile(io.BytesIO(export.build_bundle(documents, [export.MARKDOWN])))
+    assert archive.namelist() == ["resume.md", "cover_letter.md"]
+    assert archive.testzip() is None
+    assert archive.read("resume.md") == export.render(RESUME, export.MARKDOWN, "Resume")
+
+
+def test_iter_bundle_yields_chunks_per_file():
+    documents = [("a", "first", ""), ("b", "second", "")]
+    chunks = list(export.iter_bundle(documents, [export.MARKDOWN]))
+    assert len(chunks) > 1
+    assert zipfile.ZipFile(io.BytesIO(b"".join(chunks))).namelist() == ["a.md", "b.md"]
+
+
+def test_bundle_reuses_but_does_not_fill_the_render_cache(monkeypatch):
+    monkeypatch.setattr(export, "render_cache", export.RenderCache())
+    cached = export.render("cached", export.MARKDOWN)
+    documents = [("a", "cached", ""), ("b", "uncached", "")]
+    archive = zipfile.ZipFile(io.BytesIO(export.build_bundle(documents, [export.MARKDOWN])))
+    assert archive.read("a.md") == cached
+    assert len(export.render_cache._items) == 1
@@ -0,0 +1,161 @@
+import json
+import time
+
+import pytest
+
+pytest.importorskip("requests")
+
+from admission import QueueTimeoutError, get_admission_controller  # noqa: E402
+from job_providers import (  # noqa: E402
+    JobAggregator,
+    JobProvider,
+    JSearchProvider,
+    LocalFeedProvider,
+    ProvidersUnavailableError,
+)
+
+
+class StaticProvider(JobProvider):
+    def __init__(self, name, jobs, delay=0.0, timeout=1.0, error=None):
+        super().__init__(timeout)
+        self.name = name
+        self.jobs = jobs
+        self.delay = delay
+        self.error = error
+
+    def fetch(self, job_role, location):
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return self.jobs
+
+    def normalize(self, raw):
+        return dict(raw)
+
+
+def job(title, company="Acme", city="Berlin"):
+    return {"job_title": title, "employer_name": company, "job_city": city}
+
+
+def wait_for_call(provider, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while provider.stats.snapshot()["calls"] == 0:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_results_are_merged_and_deduplicated():
+    fast = StaticProvider("fast", [job("Python Dev"), job("Go Dev")])
+    slower = StaticProvider("slower", [job("python dev"), job("Rust Dev")], delay=0.05)
+    partials = []
+    aggregator = JobAggregator([fast, slower])
+
+    jobs = aggregator.search("dev", "berlin", on_partial=lambda name, merged: partials.append((name, len(merged))))
+
+    assert [j["job_title"] for j in jobs] == ["Python Dev", "Go Dev", "Rust Dev"]
+    assert {j["job_source"] for j in jobs} == {"fast", "slower"}
+    assert partials == [("fast", 2), ("slower", 3)]
+
+
+def test_slow_provider_does_not_block_and_is_recorded_once():
+    fast = StaticProvider("fast", [job("Python Dev")])
+    slow = StaticProvider("slow", [job("Late Dev")], delay=0.3, timeout=0.05)
+    aggregator = JobAggregator([fast, slow])
+
+    started = time.monotonic()
+    jobs = aggregator.search("dev", "berlin")
+    assert time.monotonic() - started < 0.25
+    assert [j["job_title"] for j in jobs] == ["Python Dev"]
+
+    # Let the abandoned call finish; it must not be recorded a second time
+    time.sleep(0.35)
+    stats = slow.stats.snapshot()
+    assert stats["calls"] == 1
+    assert stats["timeouts"] == 1
+    assert stats["error_rate"] == 1.0
+    assert fast.stats.snapshot()["error_rate"] == 0.0
+
+
+def test_call_cancelled_in_queue_is_not_a_provider_timeout():
+    blocker = StaticProvider("blocker", [], delay=0.3, timeout=1.0)
+    queued = StaticProvider("queued", [job("Never Run")], timeout=0.05)
+    aggregator = JobAggregator([blocker, queued], max_workers=1)
+
+    assert aggregator.search("dev", "berlin") == []
+    stats = queued.stats.snapshot()
+    assert stats["queue_timeouts"] == 1
+    assert stats["calls"] == 0
+    assert stats["timeouts"] == 0
+    assert stats["avg_latency_ms"] == 0.0
+
+
+def test_errors_are_counted_and_skipped():
+    broken = StaticProvider("broken", [], error=ValueError("bad response"))
+    ok = StaticProvider("ok", [job("Python Dev")])
+    aggregator = JobAggregator([broken, ok])
+
+    assert len(aggregator.search("dev", "berlin")) == 1
+    stats = broken.stats.snapshot()
+    assert stats["calls"] == 1
+    assert stats["errors"] == 1
+    assert stats["last_error"] == "bad response"
+
+
+def test_admission_error_is_raised_when_every_provider_is_rejected():
+    rejected = StaticProvider("rejected", [], error=QueueTimeoutError("rejected", "busy"))
+    with pytest.raises(QueueTimeoutError):
+        JobAggregator([rejected]).search("dev", "berlin")
+
+
+def test_admission_error_is_ignored_when_another_provider_succeeds():
+    rejected = StaticProvider("rejected", [], error=QueueTimeoutError("rejected", "busy"))
+    ok = StaticProvider("ok", [job("Python Dev")])
+    assert len(JobAggregator([rejected, ok]).search("dev", "berlin")) == 1
+
+
+def test_outage_is_reported_instead_of_an_empty_result():
+    broken = StaticProvider("broken", [], error=ValueError("bad response"))
+    slow = StaticProvider("slow", [job("Late Dev")], delay=0.3, timeout=0.05)
+    rejected = StaticProvider("rejected", [], error=QueueTimeoutError("rejected", "busy"))
+
+    with pytest.raises(ProvidersUnavailableError) as excinfo:
+        JobAggregator([broken, slow, rejected]).search("dev", "berlin")
+    assert set(excinfo.value.failures) == {"broken", "slow", "rejected"}
+    assert excinfo.value.failures["slow"] == "timed out"
+
+
+def test_no_configured_providers_is_reported():
+    class Unconfigured(StaticProvider):
+        def is_configured(self):
+            return False
+
+    with pytest.raises(ProvidersUnavailableError):
+        JobAggregator([Unconfigured("off", [])]).search("dev", "berlin")
+
+
+def test_jsearch_deadline_covers_admission_queue_and_request_timeout():
+    provider = JSearchProvider(timeout=30.0)
+    queue_timeout = get_admission_controller().get("jsearch").queue_timeout
+    assert provider.max_duration() > queue_timeout + provider.timeout
+
+
+def test_local_feed_filters_and_normalizes(tmp_path):
+    feed = tmp_path / "jobs.json"
+    feed.write_text(json.dumps({"jobs": [
+        {"id": 1, "title": "Senior Python Engineer", "company": "Acme", "city": "Berlin",
+         "description": "Django", "url": "https://example.com/1"},
+        {"id": 2, "title": "Python Developer", "company": "Remote Co", "location": "Remote",
+         "remote": True, "description": "APIs"},
+        {"id": 3, "title": "Java Developer", "company": "Beans", "city": "Berlin", "description": "Spring"},
+    ]}))
+    provider = LocalFeedProvider(str(feed))
+
+    berlin = provider.search("python", "Berlin")
+    assert [j["job_title"] for j in berlin] == ["Senior Python Engineer"]
+    assert berlin[0]["employer_name"] == "Acme"
+    assert berlin[0]["job_apply_link"] == "https://example.com/1"
+    assert berlin[0]["job_source"] == "local_feed"
+
+    remote = provider.search("python", "remote")
+    assert [j["job_title"] for j in remote] == ["Python Developer"]
+    assert remote[0]["job_city"] == "Remote"
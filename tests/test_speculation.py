@@ -0,0 +1,140 @@
+import threading
+import time
+
+import speculation
+from admission import QueueTimeoutError
+from speculation import SpeculativeTailor, estimate_tokens
+
+RESUME = "Python developer with five years of experience"
+
+
+def make_jobs(*descriptions):
+    return [{"job_description": description} for description in descriptions]
+
+
+class BlockingGenerator:
+    """Records calls and blocks each one until `release` is set"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = []
+
+    def __call__(self, job_description, resume_text):
+        self.started.append(job_description)
+        self.release.wait(5)
+        return f"tailored for {job_description}"
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.01)
+
+
+def make_tailor(generate, **kwargs):
+    tailor = SpeculativeTailor(generate, **kwargs)
+    tailor.enabled = True
+    return tailor
+
+
+def test_ready_result_is_a_hit():
+    tailor = make_tailor(lambda job, resume: f"tailored for {job}", top_k=2)
+    assert tailor.prime(make_jobs("job a", "job b", "job c"), RESUME) == 2
+    wait_until(lambda: tailor.snapshot()["ready"] == 2)
+
+    assert tailor.take("job a", RESUME) == "tailored for job a"
+    assert tailor.snapshot()["hits"] == 1
+    # A taken job is not speculated again on the next rerun
+    assert tailor.prime(make_jobs("job a", "job b", "job c"), RESUME) == 0
+
+
+def test_unknown_job_is_a_miss():
+    tailor = make_tailor(lambda job, resume: job, top_k=1)
+    tailor.prime(make_jobs("job a"), RESUME)
+    assert tailor.take("job z", RESUME) is None
+    assert tailor.snapshot()["misses"] == 1
+
+
+def test_queued_job_is_cancelled_and_refunded_on_take(monkeypatch):
+    monkeypatch.setattr(speculation, "_executor", None)
+    monkeypatch.setenv("SPECULATIVE_WORKERS", "1")
+    generator = BlockingGenerator()
+    tailor = make_tailor(generator, top_k=2)
+    tailor.prime(make_jobs("job a", "job b"), RESUME)
+    wait_until(lambda: generator.started == ["job a"])
+
+    try:
+        started = time.monotonic()
+        assert tailor.take("job b", RESUME) is None
+        assert time.monotonic() - started < 0.5
+        snapshot = tailor.snapshot()
+        assert snapshot["misses"] == 1
+        assert snapshot["late_hits"] == 0
+        assert snapshot["tokens_reserved"] == estimate_tokens("job a", RESUME)
+    finally:
+        generator.release.set()
+    assert generator.started == ["job a"]
+
+
+def test_running_job_is_waited_for():
+    generator = BlockingGenerator()
+    tailor = make_tailor(generator, top_k=1)
+    tailor.prime(make_jobs("job a"), RESUME)
+    wait_until(lambda: generator.started == ["job a"])
+
+    threading.Timer(0.05, generator.release.set).start()
+    assert tailor.take("job a", RESUME) == "tailored for job a"
+    assert tailor.snapshot()["late_hits"] == 1
+
+
+def test_new_job_list_evicts_old_entries():
+    tailor = make_tailor(lambda job, resume: job, top_k=2)
+    tailor.prime(make_jobs("job a", "job b"), RESUME)
+    wait_until(lambda: tailor.snapshot()["ready"] == 2)
+
+    tailor.prime(make_jobs("job c"), RESUME)
+    wait_until(lambda: tailor.snapshot()["ready"] == 1)
+    snapshot = tailor.snapshot()
+    assert snapshot["evicted"] == 2
+    assert snapshot["wasted_tokens"] == estimate_tokens("job a", RESUME) + estimate_tokens("job b", RESUME)
+
+
+def test_token_budget_limits_speculation():
+    budget = estimate_tokens("job a", RESUME) + 1
+    tailor = make_tailor(lambda job, resume: job, top_k=3, token_budget=budget)
+    assert tailor.prime(make_jobs("job a", "job b", "job c"), RESUME) == 1
+
+
+def test_admission_rejection_refunds_tokens():
+    def rejected(job, resume):
+        raise QueueTimeoutError("openai", "busy")
+
+    tailor = make_tailor(rejected, top_k=1)
+    tailor.prime(make_jobs("job a"), RESUME)
+    wait_until(lambda: tailor.snapshot()["ready"] == 1)
+    assert tailor.snapshot()["tokens_reserved"] == 0
+    assert tailor.take("job a", RESUME) is None
+    assert tailor.snapshot()["failed"] == 1
+
+
+def test_disabled_tailor_does_nothing():
+    tailor = SpeculativeTailor(lambda job, resume: job)
+    assert tailor.prime(make_jobs("job a"), RESUME) == 0
+    assert tailor.take("job a", RESUME) is None
+    assert tailor.snapshot()["misses"] == 0
+
+
+def test_settings_are_read_when_the_tailor_is_created(monkeypatch):
+    monkeypatch.setenv("SPECULATIVE_TOP_K", "5")
+    monkeypatch.setenv("SPECULATIVE_TOKEN_BUDGET", "123")
+    tailor = SpeculativeTailor(lambda job, resume: job)
+    assert tailor.top_k == 5
+    assert tailor.token_budget == 123
+
+
+def test_default_top_k_is_clamped_to_the_slider_range(monkeypatch):
+    monkeypatch.setenv("SPECULATIVE_TOP_K", "12")
+    assert speculation.default_top_k() == speculation.MAX_TOP_K
+    monkeypatch.setenv("SPECULATIVE_TOP_K", "0")
+    assert speculation.default_top_k() == 1